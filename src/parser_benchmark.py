@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+HTML Parser Backend Benchmark for 1688 Product Scraper
+Times every available parser backend, with full and targeted parsing, on
+archived pages and checks that all extractors produce the same output as
+full-page html.parser
+"""
+
+import sys
+import time
+import logging
+import argparse
+import tracemalloc
+
+import woocommerce_1688_scraper as scraper
+
+def load_pages(archive_dir, limit=0):
+    """Read archived product pages as (url, html) pairs"""
+    source = scraper.ReplaySource(archive_dir)
+    urls = source.load()
+    if limit:
+        urls = urls[:limit]
+    pages = [(url, scraper.read_archived_html(source.pages[url])) for url in urls]
+    return source, pages
+
+def extract_all(url, html_content, scraping_delay=0):
+    """Run every extractor on one page with a fresh ParsedPage"""
+    page = scraper.ParsedPage(html_content, url)
+    product_info = scraper.extract_product_info(html_content, url, scraping_delay=scraping_delay, page=page)
+    description = (product_info or {}).get('description') or ''
+    return {
+        'product_info': product_info,
+        'description_text': scraper.html_to_text(description, page) if description else '',
+        'debug_images': scraper.debug_extract_images_from_1688(html_content, page.soup, url),
+    }
+
+def parse_page(html_content, targeted):
+    """Build the DOM the way ParsedPage.soup does"""
+    return scraper.make_soup(html_content, parse_only=scraper.ParsedPage.strainer if targeted else None)
+
+def peak_parse_memory(pages, targeted):
+    """Largest peak of traced memory while building the DOM of one page"""
+    peak = 0
+    for _, html_content in pages:
+        tracemalloc.start()
+        soup = parse_page(html_content, targeted)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        del soup
+    return peak
+
+def benchmark_backend(backend, targeted, pages, repeat):
+    """Time DOM construction and full extraction for one backend"""
+    scraper.configure_html_parser(backend, targeted)
+    # Start from the same strategy and provider order as every other configuration
+    for chain in scraper.EXTRACTOR_CHAINS.values():
+        chain.reset()
+    scraper.TRANSLATION_ROUTER.reset()
+    parse_times, extract_times, outputs = [], [], []
+    for url, html_content in pages:
+        best_parse = best_extract = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            parse_page(html_content, targeted)
+            parse_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            output = extract_all(url, html_content)
+            extract_time = time.perf_counter() - start
+
+            best_parse = parse_time if best_parse is None else min(best_parse, parse_time)
+            best_extract = extract_time if best_extract is None else min(best_extract, extract_time)
+        parse_times.append(best_parse)
+        extract_times.append(best_extract)
+        outputs.append(output)
+    return parse_times, extract_times, outputs, peak_parse_memory(pages, targeted)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark HTML parser backends on archived 1688 pages')
+    parser.add_argument('archive', nargs='?', default=scraper.OUTPUT_DIR,
+                        help='HTML archive (or output folder / folder of page_content_*.html files)')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per page; the fastest is reported')
+    parser.add_argument('--limit', type=int, default=0, help='Only use the first N pages (0 = all)')
+    parser.add_argument('--verbose', action='store_true', help='Keep the scraper log output')
+    args = parser.parse_args()
+
+    if not args.verbose:
+        logging.getLogger().setLevel(logging.WARNING)
+
+    source, pages = load_pages(args.archive, args.limit)
+    if not pages:
+        print(f"No archived pages found in {args.archive}")
+        return 1
+
+    # Extraction fetches detailUrl pages; serve them from the archive as well
+    scraper.REPLAY_SOURCE = source
+    backends = scraper.available_html_parsers()
+    total_kb = sum(len(html_content) for _, html_content in pages) / 1024
+    print(f"{len(pages)} pages ({total_kb:.0f} KB), backends: {', '.join(backends)}, best of {args.repeat}")
+    print()
+
+    configurations = [(backend, targeted) for backend in backends for targeted in (False, True)]
+    results = {config: benchmark_backend(*config, pages, max(1, args.repeat)) for config in configurations}
+    baseline = results[('html.parser', False)][2]
+
+    print(f"{'backend':<22} {'parse ms/page':>14} {'extract ms/page':>16} {'speedup':>8} {'peak parse MB':>14} {'same output':>12}")
+    base_extract = sum(results[('html.parser', False)][1])
+    mismatches = 0
+    for backend, targeted in configurations:
+        parse_times, extract_times, outputs, peak_memory = results[(backend, targeted)]
+        differing = [url for (url, _), output, expected in zip(pages, outputs, baseline) if output != expected]
+        mismatches += len(differing)
+        label = f"{backend} ({'targeted' if targeted else 'full'})"
+        print(f"{label:<22} {1000 * sum(parse_times) / len(pages):>14.1f} "
+              f"{1000 * sum(extract_times) / len(pages):>16.1f} "
+              f"{base_extract / max(sum(extract_times), 1e-9):>7.2f}x "
+              f"{peak_memory / (1024 * 1024):>14.1f} "
+              f"{len(pages) - len(differing):>6}/{len(pages)}")
+        for url in differing:
+            print(f"    output differs from html.parser (full): {url}")
+
+    return 1 if mismatches else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -380,6 +380,16 @@ class ProfessionalScraperGUI:
         limit_entry = ttk.Entry(limit_frame, textvariable=self.url_limit_var, width=10)
         limit_entry.pack(side=tk.LEFT, padx=(10, 0))
         ttk.Label(limit_frame, text="(0 = no limit)", style='Info.TLabel').pack(side=tk.LEFT, padx=(5, 0))
+        
+        # Concurrent workers
+        workers_frame = ttk.Frame(scraping_frame)
+        workers_frame.pack(fill=tk.X, pady=(5, 0))
+        
+        ttk.Label(workers_frame, text="Concurrent Workers:", style='Info.TLabel').pack(side=tk.LEFT)
+        self.workers_var = tk.StringVar(value=str(self.settings.get('workers', 1)))
+        workers_entry = ttk.Entry(workers_frame, textvariable=self.workers_var, width=10)
+        workers_entry.pack(side=tk.LEFT, padx=(10, 0))
+        ttk.Label(workers_frame, text="(1 = one URL at a time)", style='Info.TLabel').pack(side=tk.LEFT, padx=(5, 0))
 
     def create_output_settings(self, parent):
         """Create output settings section"""
@@ -650,6 +660,8 @@ class ProfessionalScraperGUI:
             'image_optimization': True,
             'scraping_delay': 2,
             'url_limit': 0,
+            'workers': 1,
+            'fetch_mode': 'threads',
             'timestamp_folders': True,
             'backup_files': True,
             'csv_prefix': 'woocommerce_import',
@@ -661,7 +673,9 @@ class ProfessionalScraperGUI:
     def save_settings(self):
         """Save settings to file"""
         try:
-            settings = {
+            # Start from the loaded settings so keys without a GUI control are kept
+            settings = dict(self.settings)
+            settings.update({
                 'input_file': self.input_file_var.get(),
                 'output_folder': self.output_folder_var.get(),
                 'output_language': self.output_lang_var.get(),
@@ -670,13 +684,14 @@ class ProfessionalScraperGUI:
                 'image_optimization': self.image_optimization_var.get(),
                 'scraping_delay': int(self.delay_var.get()),
                 'url_limit': int(self.url_limit_var.get()),
+                'workers': max(1, int(self.workers_var.get())),
                 'timestamp_folders': self.timestamp_folders_var.get(),
                 'backup_files': self.backup_files_var.get(),
                 'csv_prefix': self.csv_prefix_var.get(),
                 'save_errors': self.save_errors_var.get(),
                 'retry_failed': self.retry_failed_var.get(),
                 'check_updates': self.check_updates_var.get()
-            }
+            })
             
             with open('settings.json', 'w', encoding='utf-8') as f:
                 json.dump(settings, f, indent=2)
@@ -922,6 +937,10 @@ https://detail.1688.com/offer/987654321.html"""
             self.scraping_delay = int(self.delay_var.get())
         except Exception:
             self.scraping_delay = 2
+        try:
+            self.workers = max(1, int(self.workers_var.get()))
+        except Exception:
+            self.workers = 1
         
         # Start scraping in a separate thread
         self.is_running = True
@@ -959,9 +978,12 @@ https://detail.1688.com/offer/987654321.html"""
             self.log_message(f"🌐 Using language code: {language_code}")
             
             # Create temporary settings file for the scraper
+            workers = getattr(self, 'workers', 1)
             scraper_settings = {
                 'language': language_code,
-                'scraping_delay': scraping_delay
+                'scraping_delay': scraping_delay,
+                'workers': workers,
+                'fetch_mode': self.settings.get('fetch_mode', 'threads')
             }
             
             # Get the project root directory (one level up from src/)
@@ -980,7 +1002,7 @@ https://detail.1688.com/offer/987654321.html"""
             self.log_message(f"📄 Script path: {scraper_script}")
             
             process = subprocess.Popen(
-                [sys.executable, scraper_script, '--scraping_delay', str(scraping_delay)],
+                [sys.executable, scraper_script, '--scraping_delay', str(scraping_delay), '--workers', str(workers)],
                 stdout=subprocess.PIPE,
                 stderr=subprocess.STDOUT,
                 universal_newlines=True,
@@ -9,7 +9,7 @@ import os
 import json
 import csv
 import cloudscraper
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer, NavigableString
 import re
 from datetime import datetime
 import logging
@@ -20,14 +20,44 @@ from PIL import Image
 from io import BytesIO
 import uuid
 import shutil
-from urllib.parse import urljoin, urlparse
+from urllib.parse import urljoin, urlparse, urlunparse, parse_qsl, urlencode
 import hashlib
+import sqlite3
+import gzip
+import threading
+import asyncio
+import queue
+from contextlib import contextmanager
+from functools import lru_cache
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, Future
+
+# Optional: zstd compression for the HTML archive (falls back to gzip)
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Optional: faster HTML parser backends (html.parser is always available)
+try:
+    import lxml
+except ImportError:
+    lxml = None
+try:
+    from selectolax.lexbor import LexborHTMLParser as SelectolaxParser
+except ImportError:
+    try:
+        from selectolax.parser import HTMLParser as SelectolaxParser
+    except ImportError:
+        SelectolaxParser = None
 
 # Always use root-level output and logs directories
 ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_ROOT = os.path.abspath(os.path.join(ROOT_DIR, '..'))
 OUTPUT_DIR = os.path.join(PROJECT_ROOT, 'output')
 LOGS_DIR = os.path.join(PROJECT_ROOT, 'logs')
+CACHE_DIR = os.path.join(PROJECT_ROOT, 'cache')
+ARCHIVE_DIR = os.path.join(OUTPUT_DIR, 'html_archive')
 
 # Configure logging
 os.makedirs(LOGS_DIR, exist_ok=True)
@@ -64,18 +94,317 @@ def log(message, level="INFO"):
         except:
             print(f"[{level}] <Message contains characters that cannot be displayed>")
 
+# Scraper settings live next to this script (src/settings.json)
+SETTINGS_FILE = os.path.join(ROOT_DIR, 'settings.json')
+
+DEFAULT_SCRAPER_SETTINGS = {
+    'scraping_delay': 2,
+    'workers': 1,
+    'session_pool_size': 0,  # 0 = one session per worker
+    'session_pool_sizes': {},
+    'fetch_mode': 'threads',  # 'threads' or 'async'
+    'max_in_flight': 200,
+    'host_concurrency': {
+        'detail.1688.com': 8,
+        'itemcdn': 16,
+        'cbu01.alicdn.com': 32,
+        'default': 8
+    },
+    # Token buckets per host group: rate = sustained requests/second, burst = bucket size.
+    # A group without a rate is not rate limited (host_concurrency still caps it).
+    'rate_limits': {},
+    # AIMD controller that moves host_concurrency limits between min and max
+    'adaptive_concurrency': {
+        'enabled': True,
+        'min': 1,
+        'max': 64,
+        'latency_target': 5.0,
+        'decrease_factor': 0.5,
+        'cooldown': 10.0
+    },
+    'response_cache': {
+        'enabled': True,
+        'ttl_hours': 24
+    },
+    # SQLite translation memory; least recently used entries beyond max_entries are evicted
+    'translation_cache': {
+        'enabled': True,
+        'max_entries': 200000
+    },
+    # Providers are skipped for cooldown seconds after failure_threshold failures in a row
+    'translation_router': {
+        'failure_threshold': 3,
+        'cooldown': 60,
+        'failure_penalty': 10
+    },
+    # Concurrent workers' translations are sent together after waiting up to max_wait_ms
+    'translation_batching': {
+        'enabled': True,
+        'max_wait_ms': 50
+    },
+    # 'auto', 'lxml', 'selectolax' or 'html.parser'; unavailable backends fall back to html.parser
+    'html_parser': 'auto',
+    # Build only the parts of product pages listed in PAGE_TARGETS
+    'targeted_parsing': True,
+    # Maximum length of the description text taken from a detailUrl page
+    'detail_description_max_chars': 20000,
+    # Images kept per product (extraction stops once this many are found)
+    'max_product_images': 20,
+    # Worker processes for parsing and extraction (0 = threads in this process)
+    'extraction_processes': 0,
+    # Translation workers fed by a queue (0 = translate in the fetching worker, the default)
+    'translation_workers': 0
+}
+
+def load_scraper_settings():
+    """Load scraper settings from settings.json, falling back to defaults for missing keys"""
+    settings = dict(DEFAULT_SCRAPER_SETTINGS)
+    try:
+        if os.path.exists(SETTINGS_FILE):
+            with open(SETTINGS_FILE, 'r', encoding='utf-8') as f:
+                settings.update(json.load(f))
+    except Exception as e:
+        log(f"Error loading settings from {SETTINGS_FILE}: {e}", "WARNING")
+    return settings
+
+# HTML parser backends, fastest first. selectolax has no BeautifulSoup tree
+# builder, so with it the DOM is built by lxml (or html.parser) and selectolax
+# only extracts the text of HTML fragments.
+HTML_PARSERS = ('selectolax', 'lxml', 'html.parser')
+HTML_PARSER = 'html.parser'
+TARGETED_PARSING = False
+
+def available_html_parsers():
+    """HTML parser backends that can be used in this environment, fastest first"""
+    available = {'selectolax': SelectolaxParser is not None, 'lxml': lxml is not None, 'html.parser': True}
+    return [name for name in HTML_PARSERS if available[name]]
+
+def configure_html_parser(name='auto', targeted=False):
+    """Select the HTML parser backend used by make_soup/html_fragment_text"""
+    global HTML_PARSER, TARGETED_PARSING
+    TARGETED_PARSING = bool(targeted)
+    available = available_html_parsers()
+    if name in (None, '', 'auto'):
+        # lxml builds the DOM faster than html.parser and is the tree builder used
+        # with selectolax anyway, so prefer it for the default
+        HTML_PARSER = 'lxml' if 'lxml' in available else available[0]
+    elif name in available:
+        HTML_PARSER = name
+    else:
+        log(f"HTML parser backend '{name}' is not available, using html.parser", "WARNING")
+        HTML_PARSER = 'html.parser'
+    return HTML_PARSER
+
+def make_soup(html_content, parse_only=None):
+    """BeautifulSoup tree of html_content built with the configured backend"""
+    features = 'lxml' if HTML_PARSER in ('lxml', 'selectolax') and lxml is not None else 'html.parser'
+    return BeautifulSoup(html_content, features, parse_only=parse_only)
+
+def html_fragment_text(fragment):
+    """Text of an HTML fragment, space separated like BeautifulSoup.get_text(' ', strip=True)"""
+    if HTML_PARSER == 'selectolax':
+        tree = SelectolaxParser(fragment)
+        # get_text() skips script/style contents; match it
+        tree.strip_tags(['script', 'style', 'template'])
+        root = tree.body or tree.root
+        return root.text(separator=' ', strip=True) if root is not None else ''
+    return make_soup(fragment).get_text(separator=' ', strip=True)
+
+class TrackedPattern:
+    """A compiled regular expression that reports its usage to a RegexRegistry"""
+    def __init__(self, registry, name, pattern, flags=0):
+        self.name = name
+        self.regex = re.compile(pattern, flags)
+        self.pattern = self.regex.pattern
+        self._registry = registry
+
+    def _timed(self, method, count, *args, **kwargs):
+        started = time.perf_counter()
+        result = method(*args, **kwargs)
+        self._registry.record(self.name, time.perf_counter() - started, count(result))
+        return result
+
+    def search(self, string, *args):
+        return self._timed(self.regex.search, lambda m: 1 if m else 0, string, *args)
+
+    def match(self, string, *args):
+        return self._timed(self.regex.match, lambda m: 1 if m else 0, string, *args)
+
+    def findall(self, string, *args):
+        return self._timed(self.regex.findall, len, string, *args)
+
+    def finditer(self, string, *args):
+        # Materialized so the time spent matching is attributed to this pattern
+        return self._timed(lambda *a: list(self.regex.finditer(*a)), len, string, *args)
+
+    def iterate(self, string, *args):
+        """Lazy finditer, for scans that stop early; time is recorded for the matches consumed"""
+        iterator = self.regex.finditer(string, *args)
+        seconds = 0.0
+        matches = 0
+        try:
+            while True:
+                started = time.perf_counter()
+                match = next(iterator, None)
+                seconds += time.perf_counter() - started
+                if match is None:
+                    return
+                matches += 1
+                yield match
+        finally:
+            self._registry.record(self.name, seconds, matches)
+
+    def sub(self, repl, string, count=0):
+        return self._timed(self.regex.subn, lambda r: r[1], repl, string, count)[0]
+
+class RegexRegistry:
+    """Precompiled regular expressions by name, with call, match and time totals per pattern.
+    
+    Patterns are registered once at import time with compile(); the stats show
+    which of them cost CPU on real pages and which never match.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.patterns = {}
+        self.stats = {}
+
+    def compile(self, name, pattern, flags=0):
+        if name in self.patterns:
+            raise ValueError(f"Regex '{name}' is already registered")
+        tracked = TrackedPattern(self, name, pattern, flags)
+        self.patterns[name] = tracked
+        self.stats[name] = {'calls': 0, 'matches': 0, 'seconds': 0.0}
+        return tracked
+
+    def record(self, name, seconds, matches):
+        with self._lock:
+            entry = self.stats[name]
+            entry['calls'] += 1
+            entry['matches'] += matches
+            entry['seconds'] += seconds
+
+    def report(self):
+        """Stats per pattern name, most expensive first"""
+        with self._lock:
+            stats = {name: dict(entry) for name, entry in self.stats.items()}
+        return dict(sorted(stats.items(), key=lambda item: item[1]['seconds'], reverse=True))
+
+    def reset(self):
+        with self._lock:
+            for entry in self.stats.values():
+                entry.update(calls=0, matches=0, seconds=0.0)
+
+REGEXES = RegexRegistry()
+
+IMAGE_URL_IN_TEXT_RE = REGEXES.compile('fix_image_url.url_in_text', r'https?://[^\s\"\']+')
+IMAGE_SIZE_SUFFIX_RE = REGEXES.compile('fix_image_url.size_suffix', r'[_-]\d{2,4}x\d{2,4}')
+
+# Markers checked on every image URL, as one compiled alternation each
+IMAGE_LOW_QUALITY_MARKERS = ['search', 'summ', '_50x50', '_100x100', '_200x200',
+                             '_300x300', '_400x400', '_500x500', '_600x600',
+                             'q60', 'q50', 'q40', 'q30']
+IMAGE_SIZE_PARAMS = ['_50x50', '_100x100', '_200x200', '_300x300', '_400x400',
+                     '_500x500', '_600x600', '_800x800', '_1000x1000', '_1200x1200',
+                     '_1500x1500', '_2000x2000', '.220x220', '.310x310']
+IMAGE_QUALITY_PARAMS = ['Q75', 'Q60', 'Q50', 'Q40', 'Q30']
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp', '.gif')
+IMAGE_LOW_QUALITY_RE = REGEXES.compile('fix_image_url.low_quality', '|'.join(map(re.escape, IMAGE_LOW_QUALITY_MARKERS)))
+IMAGE_SIZE_PARAM_RE = REGEXES.compile('fix_image_url.size_param', '|'.join(map(re.escape, IMAGE_SIZE_PARAMS)))
+IMAGE_QUALITY_PARAM_RE = REGEXES.compile('fix_image_url.quality_param', '|'.join(map(re.escape, IMAGE_QUALITY_PARAMS)))
+
+# Distinct raw URLs whose normalized form is memoized
+IMAGE_URL_CACHE_SIZE = 8192
+
 def fix_image_url(url):
     """Clean and fix image URL and filter out low-quality images"""
     if not url or not isinstance(url, str):
         return None
+    return _normalize_image_url(url)
+
+def normalize_image_urls(raw_urls, known=()):
+    """Canonical image URLs for raw_urls in one pass: invalid and low-quality
+    entries dropped, duplicates (and URLs already in known) removed, order kept"""
+    seen = set(known)
+    images = []
+    for url in raw_urls:
+        if not url or not isinstance(url, str):
+            continue
+        clean_url = _normalize_image_url(url)
+        if clean_url and clean_url not in seen:
+            seen.add(clean_url)
+            images.append(clean_url)
+    return images
+
+# Images kept per product; extraction stops once this many are collected
+MAX_PRODUCT_IMAGES = 20
+
+# Image fallbacks keep running until a product has at least this many images
+MIN_PRODUCT_IMAGES = 5
+
+class ImageCollection:
+    """Ordered set of image URLs, each tagged with the source that found it.
     
+    Membership is O(1) and insertion order is kept. With a limit the collection
+    stops accepting URLs once `full`, so extractors can stop early.
+    """
+    def __init__(self, limit=None):
+        self.limit = limit
+        self._sources = {}
+
+    @property
+    def full(self):
+        return bool(self.limit) and len(self._sources) >= self.limit
+
+    def add(self, url, source, normalize=True):
+        """Add one URL (cleaned with fix_image_url unless normalize is False); True if it was new"""
+        if self.full:
+            return False
+        if normalize:
+            url = fix_image_url(url)
+        if not url or url in self._sources:
+            return False
+        self._sources[url] = source
+        return True
+
+    def extend(self, urls, source, normalize=True):
+        """Add URLs in order until the collection is full; returns how many were new"""
+        added = 0
+        for url in urls:
+            if self.full:
+                break
+            if self.add(url, source, normalize):
+                added += 1
+        return added
+
+    def urls(self):
+        return list(self._sources)
+
+    def source_of(self, url):
+        return self._sources.get(url)
+
+    def counts_by_source(self):
+        counts = {}
+        for source in self._sources.values():
+            counts[source] = counts.get(source, 0) + 1
+        return counts
+
+    def __contains__(self, url):
+        return url in self._sources
+
+    def __len__(self):
+        return len(self._sources)
+
+    def __iter__(self):
+        return iter(list(self._sources))
+
+@lru_cache(maxsize=IMAGE_URL_CACHE_SIZE)
+def _normalize_image_url(url):
+    """fix_image_url for a non-empty string, memoized per raw URL"""
     # Clean up the URL
     url = url.strip()
     
     # Skip low-quality images
-    if any(q in url.lower() for q in ['search', 'summ', '_50x50', '_100x100', '_200x200', 
-                                    '_300x300', '_400x400', '_500x500', '_600x600',
-                                    'q60', 'q50', 'q40', 'q30']):
+    if IMAGE_LOW_QUALITY_RE.search(url.lower()):
         return None
     
     # Handle malformed JSON URLs first
@@ -89,7 +418,7 @@ def fix_image_url(url):
                     break
         except (json.JSONDecodeError, TypeError):
             # If not valid JSON, try to extract URL with regex
-            url_match = re.search(r'https?://[^\s\"\']+', url)
+            url_match = IMAGE_URL_IN_TEXT_RE.search(url)
             if url_match:
                 url = url_match.group(0)
     
@@ -127,60 +456,288 @@ def fix_image_url(url):
         url = url.split('_.png')[0] + '.png'
     
     # Remove any other size parameters that might be in the URL
-    for size_param in ['_50x50', '_100x100', '_200x200', '_300x300', '_400x400', 
-                      '_500x500', '_600x600', '_800x800', '_1000x1000', '_1200x1200',
-                      '_1500x1500', '_2000x2000', '.220x220', '.310x310']:
-        if size_param in url:
-            url = url.replace(size_param, '')
+    # (applied one by one, in order, only when any of them is present)
+    if IMAGE_SIZE_PARAM_RE.search(url):
+        for size_param in IMAGE_SIZE_PARAMS:
+            if size_param in url:
+                url = url.replace(size_param, '')
     
     # Remove any quality parameters
     if 'Q90' in url and '.jpg' in url:
         url = url.split('Q90')[0] + '.jpg'
     
     # Remove any other quality parameters
-    for q_param in ['Q75', 'Q60', 'Q50', 'Q40', 'Q30']:
-        if q_param in url and '.jpg' in url:
-            url = url.split(q_param)[0] + '.jpg'
+    if '.jpg' in url and IMAGE_QUALITY_PARAM_RE.search(url):
+        for q_param in IMAGE_QUALITY_PARAMS:
+            if q_param in url and '.jpg' in url:
+                url = url.split(q_param)[0] + '.jpg'
     
     # Remove any other query parameters that might be in the URL
     if '?' in url:
         base_url = url.split('?')[0]
         # Only keep the base URL if it ends with an image extension
-        if any(base_url.lower().endswith(ext) for ext in ['.jpg', '.jpeg', '.png', '.webp', '.gif']):
+        if base_url.lower().endswith(IMAGE_EXTENSIONS):
             url = base_url
     
     # Final cleanup of any remaining size indicators
-    url = re.sub(r'[_-]\d{2,4}x\d{2,4}', '', url)
+    url = IMAGE_SIZE_SUFFIX_RE.sub('', url)
     
     # Remove any trailing dots or invalid characters
     url = url.rstrip('.').strip()
     
-    return url if any(url.lower().endswith(ext) for ext in ['.jpg', '.jpeg', '.png', '.webp', '.gif']) else None
+    return url if url.lower().endswith(IMAGE_EXTENSIONS) else None
 
-def extract_images_from_1688(html_content, soup):
-    """Extract images using 1688's actual data structure"""
-    images = []
+# Keys collected from the embedded JSON in a single walk; downstream extractors
+# read their fields from here instead of re-scanning the HTML
+PAGE_JSON_KEYS = {
+    'offerImgList', 'mainImageList', 'imageList', 'featureAttributes', 'productPackInfo',
+    'offerDetail', 'detailUrl', 'price', 'title', 'subject', 'productInfo', 'specification',
+    'material', 'brand', 'model', 'color', 'size', 'weight', 'origin', 'warranty',
+    'companyName', 'sellerLoginId', 'leafCategoryName', 'saleCount', 'unit',
+    'imageUrls', 'picList', 'imageUrl', 'picUrl', 'image_url', 'img', 'url'
+}
+
+# Start of an embedded JSON blob: `window.name = {` / `window.name = [` or `"offerDetail": {`
+PAGE_JSON_START = re.compile(r'(?:window\.([A-Za-z_$][\w$]*)\s*=\s*|"(offerDetail)"\s*:\s*)(?=[{\[])')
+
+class PageJson:
+    """Embedded JSON of a 1688 page, located and parsed in one pass over the HTML.
+    
+    `blobs` holds (name, parsed object) for every window.* assignment (and any
+    standalone "offerDetail" object) that is valid JSON; `fields` maps each key in
+    PAGE_JSON_KEYS to all values found for it, in document order.
+    """
+    _decoder = json.JSONDecoder()
+
+    def __init__(self, html_content):
+        self.blobs = []
+        self.fields = {}
+        self._parse(html_content or '')
+        self._collect()
+
+    def _parse(self, html_content):
+        pos = 0
+        while True:
+            match = PAGE_JSON_START.search(html_content, pos)
+            if not match:
+                break
+            try:
+                obj, end = self._decoder.raw_decode(html_content, match.end())
+            except ValueError:
+                # Not strict JSON (e.g. a JS object literal); keep scanning inside it
+                pos = match.end()
+                continue
+            self.blobs.append((match.group(1) or match.group(2), obj))
+            # Continue after the blob: anything inside it has already been parsed
+            pos = end
+
+    def _collect(self):
+        stack = [obj for _, obj in reversed(self.blobs)]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, dict):
+                children = []
+                for key, value in node.items():
+                    if key in PAGE_JSON_KEYS:
+                        self.fields.setdefault(key, []).append(value)
+                    if isinstance(value, (dict, list)):
+                        children.append(value)
+                stack.extend(reversed(children))
+            elif isinstance(node, list):
+                stack.extend(item for item in reversed(node) if isinstance(item, (dict, list)))
+
+    def values(self, key):
+        """All values found for key, in document order"""
+        return self.fields.get(key, [])
+
+    def first(self, key, types=str):
+        """First non-empty value for key of the given type(s), or None"""
+        for value in self.values(key):
+            if isinstance(value, types) and value not in ('', [], {}):
+                return value
+        return None
+
+    def blob(self, name):
+        """Parsed object assigned to window.<name>, or None"""
+        for blob_name, obj in self.blobs:
+            if blob_name == name:
+                return obj
+        return None
+
+    def image_urls(self, key):
+        """Image URLs listed under key (plain strings or image objects)"""
+        urls = []
+        for value in self.values(key):
+            for item in value if isinstance(value, list) else [value]:
+                if isinstance(item, str):
+                    urls.append(item)
+                elif isinstance(item, dict):
+                    for field in ('fullPathImageURI', 'imageURI', 'imageUrl', 'url'):
+                        if isinstance(item.get(field), str):
+                            urls.append(item[field])
+                            break
+        return urls
+
+def parse_page_json(html_content):
+    """Locate and parse all embedded JSON blobs of a page in a single pass"""
+    try:
+        page_json = PageJson(html_content)
+        log(f"Parsed {len(page_json.blobs)} embedded JSON blobs ({', '.join(name for name, _ in page_json.blobs) or 'none'})", "DEBUG")
+        return page_json
+    except Exception as e:
+        log(f"Error parsing embedded JSON: {str(e)}", "WARNING")
+        return PageJson('')
+
+# Elements of a product page that the DOM extractors read, per extractor. With
+# targeted parsing only these elements (with everything inside them) are built
+# into the tree, so an extractor that selects new elements must list them here.
+# Keys are a tag name and/or attributes; 'attr*' matches a substring like CSS [attr*=].
+PAGE_TARGETS = {
+    'name': [{'name': 'title'}, {'id': 'productTitle'}],
+    'price': [{'id': 'mainPrice'}],
+    'attributes': [{'id': 'productAttributes'}],
+    'description': [{'id': 'description'}, {'class': 'desc-content'}],
+    'images': [
+        {'name': 'script'},
+        {'name': 'img'},
+        {'name': 'meta', 'property*': 'og:image'},
+        {'class': 'od-gallery-turn-item-wrapper'},
+        {'class': 'offer-img'},
+        {'class*': 'image'},
+    ],
+}
+
+class PageTargetStrainer(SoupStrainer):
+    """SoupStrainer that keeps every tag matching one of the PAGE_TARGETS"""
+    def __init__(self, targets):
+        super().__init__()
+        self.targets = [target for extractor_targets in targets.values() for target in extractor_targets]
+
+    def matches(self, name, attrs):
+        attrs = attrs or {}
+        for target in self.targets:
+            if self._matches_target(target, name, attrs):
+                return True
+        return False
+
+    @staticmethod
+    def _matches_target(target, name, attrs):
+        for key, expected in target.items():
+            if key == 'name':
+                if name != expected:
+                    return False
+                continue
+            value = attrs.get(key.rstrip('*'))
+            if value is None:
+                return False
+            if isinstance(value, (list, tuple)):
+                value = ' '.join(value)
+            if key.endswith('*'):
+                if expected not in value:
+                    return False
+            elif key == 'class':
+                if expected not in value.split():
+                    return False
+            elif value != expected:
+                return False
+        return True
+
+    # beautifulsoup4 >= 4.13
+    def allow_tag_creation(self, nsprefix, name, attrs):
+        return self.matches(name, attrs)
+
+    # beautifulsoup4 < 4.13
+    def search_tag(self, markup_name=None, markup_attrs={}):
+        return markup_name if self.matches(markup_name, dict(markup_attrs or {})) else None
+
+class ParsedPage:
+    """One fetched page, tokenized at most once and shared by every pipeline stage.
+    
+    The DOM and the embedded JSON are built on first use; text extracted from
+    HTML fragments of the page (e.g. the description) is memoized as well.
+    With targeted parsing, `soup` holds only the PAGE_TARGETS subtrees and the
+    whole-page tree (`full_soup`) is only built for extractors that need it.
+    """
+    strainer = PageTargetStrainer(PAGE_TARGETS)
+
+    def __init__(self, html_content, url=None, offline=False):
+        self.html = html_content or ''
+        self.url = url
+        # Offline pages (in extraction worker processes) skip network strategies;
+        # they are listed in `deferred` as (field, strategy) for the caller to run
+        self.offline = offline
+        self.deferred = []
+        # (field, strategy, seconds, success) for every extractor strategy run
+        self.extractions = []
+        self._soup = None
+        self._full_soup = None
+        self._page_json = None
+        self._fragment_text = {}
+
+    @property
+    def soup(self):
+        if self._soup is None:
+            if TARGETED_PARSING:
+                self._soup = make_soup(self.html, parse_only=self.strainer)
+            else:
+                self._soup = self.full_soup
+        return self._soup
+
+    @property
+    def full_soup(self):
+        if self._full_soup is None:
+            self._full_soup = make_soup(self.html)
+        return self._full_soup
+
+    @property
+    def page_json(self):
+        if self._page_json is None:
+            self._page_json = parse_page_json(self.html)
+        return self._page_json
+
+    def text_of(self, fragment):
+        """Whitespace-normalized text of an HTML fragment taken from this page"""
+        if fragment not in self._fragment_text:
+            text = html_fragment_text(fragment)
+            self._fragment_text[fragment] = re.sub(r'\s+', ' ', text).strip()
+        return self._fragment_text[fragment]
+
+def html_to_text(text, page=None):
+    """Plain text of text if it contains HTML, reusing the page's parsed fragments when given"""
+    if '<' in text and '>' in text:
+        if page is not None:
+            return page.text_of(text)
+        text = html_fragment_text(text)
+    return re.sub(r'\s+', ' ', text).strip()
+
+# Image arrays and URLs in script tags, then 1688 CDN URLs anywhere in the HTML
+SCRIPT_IMAGE_RES = [
+    REGEXES.compile('extract_images.script.imageList', r'"imageList":\s*\[(.*?)\]'),
+    REGEXES.compile('extract_images.script.images', r'"images":\s*\[(.*?)\]'),
+    REGEXES.compile('extract_images.script.imgUrl', r'"imgUrl":"([^"]+)"'),
+    REGEXES.compile('extract_images.script.fullPathImageURI', r'"fullPathImageURI":"([^"]+)"')
+]
+CDN_IMAGE_RE = REGEXES.compile('extract_images.cdn', r'(https://cbu01\.alicdn\.com/[^"\s>]+\.(?:jpg|jpeg|png|webp))')
+CDN_IBANK_IMAGE_RE = REGEXES.compile('extract_images_json.cdn', r'https://cbu01\.alicdn\.com/img/ibank/[^"\s>]+\.jpg')
+
+def extract_images_from_1688(html_content, soup, images=None, placeholder=True):
+    """Extract images using 1688's actual data structure (into images, an ImageCollection, if given).
+    
+    Falls back to a placeholder image when nothing was found, unless placeholder is False.
+    """
+    images = images if images is not None else ImageCollection(MAX_PRODUCT_IMAGES)
     
     # Method 1: Extract from JSON data in script tags
     script_tags = soup.find_all('script')
     for script in script_tags:
+        if images.full:
+            break
         if script.string and ('imageList' in script.string or 'images' in script.string):
             try:
                 # Look for image arrays in JavaScript
-                image_patterns = [
-                    r'"imageList":\s*\[(.*?)\]',
-                    r'"images":\s*\[(.*?)\]',
-                    r'"imgUrl":"([^"]+)"',
-                    r'"fullPathImageURI":"([^"]+)"'
-                ]
-                
-                for pattern in image_patterns:
-                    matches = re.findall(pattern, script.string)
-                    for match in matches:
-                        if isinstance(match, str) and 'http' in match:
-                            clean_url = fix_image_url(match)
-                            if clean_url and clean_url not in images:
-                                images.append(clean_url)
+                for pattern in SCRIPT_IMAGE_RES:
+                    matches = pattern.findall(script.string)
+                    images.extend((match for match in matches if isinstance(match, str) and 'http' in match), 'script')
                                 
             except Exception as e:
                 continue
@@ -195,100 +752,122 @@ def extract_images_from_1688(html_content, soup):
     ]
     
     for selector in img_selectors:
+        if images.full:
+            break
         imgs = soup.select(selector)
         for img in imgs:
             # Try multiple attributes
             for attr in ['data-lazy-src', 'data-original', 'data-src', 'src']:
                 img_url = img.get(attr)
                 if img_url:
-                    clean_url = fix_image_url(img_url)
-                    if clean_url and clean_url not in images:
-                        images.append(clean_url)
+                    images.add(img_url, 'img selector')
                     break
     
-    # Method 3: Regex for 1688 CDN URLs in HTML
-    cdn_pattern = r'(https://cbu01\.alicdn\.com/[^"\s>]+\.(?:jpg|jpeg|png|webp))'
-    cdn_matches = re.findall(cdn_pattern, html_content)
-    for match in cdn_matches:
-        clean_url = fix_image_url(match)
-        if clean_url and clean_url not in images:
-            images.append(clean_url)
+    # Method 3: Regex for 1688 CDN URLs in HTML, scanned lazily so it stops once full
+    images.extend((match.group(1) for match in CDN_IMAGE_RE.iterate(html_content)), 'CDN regex')
     
     # If no images were successfully extracted, use online sample images
-    if not images:
+    if placeholder and not images:
         log("No product images could be found, using online sample images")
         
         # Use a reliable placeholder image
-        images = ["https://via.placeholder.com/800x800?text=No+Image+Available"]
+        images.add("https://via.placeholder.com/800x800?text=No+Image+Available", 'placeholder', normalize=False)
         log("Using placeholder image")
             
         log(f"Added {len(images)} online sample images")
     
-    return images
+    return images.urls()
 
-def extract_images_from_1688_json(html_content):
+def extract_images_from_1688_json(html_content, page_json=None, images=None):
     """Extract images from 1688's JSON data structures - the most reliable method"""
-    images = []
+    images = images if images is not None else ImageCollection(MAX_PRODUCT_IMAGES)
     
     try:
-        # Method 1: Extract from offerImgList in gallery section
-        offer_img_pattern = r'"offerImgList":\[(.*?)\]'
-        offer_matches = re.findall(offer_img_pattern, html_content, re.DOTALL)
-        
-        for match in offer_matches:
-            # Clean the match and extract URLs
-            urls = re.findall(r'"([^"]*cbu01\.alicdn\.com[^"]*\.jpg)"', match)
-            for url in urls:
-                clean_url = fix_image_url(url)
-                if clean_url and clean_url not in images:
-                    images.append(clean_url)
-                    log(f"Found image from offerImgList: {clean_url}")
-        
-        # Method 2: Extract from mainImageList in offerDetail section
-        main_img_pattern = r'"mainImageList":\[(.*?)\]'
-        main_matches = re.findall(main_img_pattern, html_content, re.DOTALL)
-        
-        for match in main_matches:
-            # Look for fullPathImageURI in each image object
-            full_path_matches = re.findall(r'"fullPathImageURI":"([^"]*)"', match)
-            for url in full_path_matches:
-                clean_url = fix_image_url(url)
-                if clean_url and clean_url not in images:
-                    images.append(clean_url)
-                    log(f"Found image from mainImageList: {clean_url}")
-        
-        # Method 3: Extract from imageList in offerDetail section
-        img_list_pattern = r'"imageList":\[(.*?)\]'
-        img_list_matches = re.findall(img_list_pattern, html_content, re.DOTALL)
-        
-        for match in img_list_matches:
-            # Look for fullPathImageURI in each image object
-            full_path_matches = re.findall(r'"fullPathImageURI":"([^"]*)"', match)
-            for url in full_path_matches:
-                clean_url = fix_image_url(url)
-                if clean_url and clean_url not in images:
-                    images.append(clean_url)
-                    log(f"Found image from imageList: {clean_url}")
-        
-        # Method 4: Direct regex for 1688 CDN URLs
-        cdn_pattern = r'https://cbu01\.alicdn\.com/img/ibank/[^"\s>]+\.jpg'
-        cdn_matches = re.findall(cdn_pattern, html_content)
-        for url in cdn_matches:
-            clean_url = fix_image_url(url)
-            if clean_url and clean_url not in images:
-                images.append(clean_url)
-                log(f"Found image from CDN pattern: {clean_url}")
+        page_json = page_json or parse_page_json(html_content)
+        
+        if page_json.blobs:
+            # Methods 1-3: offerImgList (gallery), mainImageList and imageList (offerDetail),
+            # served from the JSON parsed once for this page
+            for source in ('offerImgList', 'mainImageList', 'imageList'):
+                found = images.extend(page_json.image_urls(source), source)
+                if found:
+                    log(f"Found {found} images from {source}")
+        else:
+            extract_images_from_1688_json_regex(html_content, images)
+        
+        # Method 4: Direct regex for 1688 CDN URLs (stops once the collection is full)
+        found = images.extend((match.group(0) for match in CDN_IBANK_IMAGE_RE.iterate(html_content)), 'CDN regex')
+        if found:
+            log(f"Found {found} images from CDN pattern")
         
         log(f"Total images extracted from JSON: {len(images)}")
-        return images
+        return images.urls()
         
     except Exception as e:
         log(f"Error extracting images from JSON: {str(e)}", "ERROR")
         return []
 
+JSON_OFFER_IMG_LIST_RE = REGEXES.compile('extract_images_json_regex.offerImgList', r'"offerImgList":\[(.*?)\]', re.DOTALL)
+JSON_OFFER_IMG_URL_RE = REGEXES.compile('extract_images_json_regex.offerImgList.url', r'"([^"]*cbu01\.alicdn\.com[^"]*\.jpg)"')
+JSON_MAIN_IMAGE_LIST_RE = REGEXES.compile('extract_images_json_regex.mainImageList', r'"mainImageList":\[(.*?)\]', re.DOTALL)
+JSON_IMAGE_LIST_RE = REGEXES.compile('extract_images_json_regex.imageList', r'"imageList":\[(.*?)\]', re.DOTALL)
+JSON_FULL_PATH_IMAGE_RE = REGEXES.compile('extract_images_json_regex.fullPathImageURI', r'"fullPathImageURI":"([^"]*)"')
+
+def extract_images_from_1688_json_regex(html_content, images=None):
+    """Regex fallback for pages whose embedded data is not valid JSON"""
+    images = images if images is not None else ImageCollection(MAX_PRODUCT_IMAGES)
+    
+    # Method 1: Extract from offerImgList in gallery section
+    offer_matches = JSON_OFFER_IMG_LIST_RE.findall(html_content)
+    
+    for match in offer_matches:
+        # Clean the match and extract URLs
+        urls = JSON_OFFER_IMG_URL_RE.findall(match)
+        found = images.extend(urls, 'offerImgList')
+        if found:
+            log(f"Found {found} images from offerImgList")
+    
+    # Method 2: Extract from mainImageList in offerDetail section
+    main_matches = JSON_MAIN_IMAGE_LIST_RE.findall(html_content)
+    
+    for match in main_matches:
+        # Look for fullPathImageURI in each image object
+        full_path_matches = JSON_FULL_PATH_IMAGE_RE.findall(match)
+        found = images.extend(full_path_matches, 'mainImageList')
+        if found:
+            log(f"Found {found} images from mainImageList")
+    
+    # Method 3: Extract from imageList in offerDetail section
+    img_list_matches = JSON_IMAGE_LIST_RE.findall(html_content)
+    
+    for match in img_list_matches:
+        # Look for fullPathImageURI in each image object
+        full_path_matches = JSON_FULL_PATH_IMAGE_RE.findall(match)
+        found = images.extend(full_path_matches, 'imageList')
+        if found:
+            log(f"Found {found} images from imageList")
+    
+    return images.urls()
+
+DEBUG_JSON_IMAGE_RES = [
+    REGEXES.compile(f'debug_extract_images.{name}', pattern, re.DOTALL)
+    for name, pattern in (
+        ('runParams', r'window\.runParams\s*=\s*({.+?});'),
+        ('detailData', r'window\.detailData\s*=\s*({.+?});'),
+        ('imageList', r'"imageList"\s*:\s*(\[.*?\])'),
+        ('imageUrls', r'"imageUrls"\s*:\s*(\[.*?\])'),
+        ('picList', r'"picList"\s*:\s*(\[.*?\])'),
+        ('imageUrl', r'"imageUrl"\s*:\s*\"([^\"]+)\"'),
+        ('picUrl', r'"picUrl"\s*:\s*\"([^\"]+)\"'),
+        ('image_url', r'"image_url"\s*:\s*\"([^\"]+)\"'),
+        ('img', r'"img"\s*:\s*\"([^\"]+)\"'),
+        ('url', r'"url"\s*:\s*\"([^\"]+)\"')
+    )
+]
+
 def debug_extract_images_from_1688(html_content, soup, url):
     """Enhanced debug version to extract images with multiple methods"""
-    images = []
+    images = ImageCollection()
     base_url = '/'.join(url.split('/')[:3])
     
     log(f"Starting image extraction for URL: {url}", "DEBUG")
@@ -323,29 +902,14 @@ def debug_extract_images_from_1688(html_content, soup, url):
                 'http' in img_src and 
                 any(x in img_src for x in ['.jpg', '.jpeg', '.png', '.webp']) and
                 not any(x in img_src.lower() for x in ['logo', 'icon', 'placeholder', 'spacer', 'pixel']) and
-                img_src not in images):
-                
-                images.append(img_src)
+                images.add(img_src, 'img tag', normalize=False)):
                 log(f"  Added image: {img_src}", "DEBUG")
     
     # Method 2: Look in JSON data
     log("\nMethod 2: Looking for images in JSON data...", "DEBUG")
-    json_patterns = [
-        r'window\.runParams\s*=\s*({.+?});',
-        r'window\.detailData\s*=\s*({.+?});',
-        r'"imageList"\s*:\s*(\[.*?\])',
-        r'"imageUrls"\s*:\s*(\[.*?\])',
-        r'"picList"\s*:\s*(\[.*?\])',
-        r'"imageUrl"\s*:\s*\"([^\"]+)\"',
-        r'"picUrl"\s*:\s*\"([^\"]+)\"',
-        r'"image_url"\s*:\s*\"([^\"]+)\"',
-        r'"img"\s*:\s*\"([^\"]+)\"',
-        r'"url"\s*:\s*\"([^\"]+)\"'
-    ]
-    
-    for pattern in json_patterns:
+    for pattern in DEBUG_JSON_IMAGE_RES:
         try:
-            matches = re.finditer(pattern, html_content, re.DOTALL)
+            matches = pattern.finditer(html_content)
             for match in matches:
                 if not match.group(1):
                     continue
@@ -358,8 +922,7 @@ def debug_extract_images_from_1688(html_content, soup, url):
                             for url in urls:
                                 if isinstance(url, str) and 'http' in url:
                                     fixed_url = fix_image_url(url)
-                                    if fixed_url and fixed_url not in images:
-                                        images.append(fixed_url)
+                                    if images.add(fixed_url, 'JSON', normalize=False):
                                         log(f"  Added image from JSON array: {fixed_url}", "DEBUG")
                     except json.JSONDecodeError:
                         pass
@@ -367,12 +930,11 @@ def debug_extract_images_from_1688(html_content, soup, url):
                 elif 'http' in match.group(1):
                     fixed_url = fix_image_url(match.group(1))
                     if (fixed_url and 
-                        fixed_url not in images and 
-                        any(x in fixed_url for x in ['.jpg', '.jpeg', '.png', '.webp'])):
-                        images.append(fixed_url)
+                        any(x in fixed_url for x in ['.jpg', '.jpeg', '.png', '.webp']) and
+                        images.add(fixed_url, 'JSON', normalize=False)):
                         log(f"  Added image from JSON: {fixed_url}", "DEBUG")
         except Exception as e:
-            log(f"Error processing pattern {pattern}: {str(e)}", "DEBUG")
+            log(f"Error processing pattern {pattern.pattern}: {str(e)}", "DEBUG")
     
     # Method 3: Look in meta tags
     log("\nMethod 3: Looking for images in meta tags...", "DEBUG")
@@ -381,13 +943,14 @@ def debug_extract_images_from_1688(html_content, soup, url):
             img_url = meta['content']
             if img_url.startswith('//'):
                 img_url = 'https:' + img_url
-            if img_url not in images:
-                images.append(img_url)
+            if images.add(img_url, 'meta', normalize=False):
                 log(f"  Added image from meta tag: {img_url}", "DEBUG")
     
-    # Clean up and validate URLs
-    cleaned_images = []
+    # Clean up and validate URLs (max 20 images)
+    cleaned_images = ImageCollection(limit=20)
     for img in images:
+        if cleaned_images.full:
+            break
         try:
             # Remove query parameters that might cause issues
             img = img.split('?')[0]
@@ -396,34 +959,202 @@ def debug_extract_images_from_1688(html_content, soup, url):
                 img = urljoin(base_url, img)
             # Basic validation
             if (any(x in img for x in ['.jpg', '.jpeg', '.png', '.webp']) and 
-                not any(x in img.lower() for x in ['logo', 'icon', 'placeholder', 'spacer']) and
-                img not in cleaned_images):
-                cleaned_images.append(img)
+                not any(x in img.lower() for x in ['logo', 'icon', 'placeholder', 'spacer'])):
+                cleaned_images.add(img, images.source_of(img), normalize=False)
         except Exception as e:
             log(f"Error cleaning image URL {img}: {str(e)}", "DEBUG")
     
     log(f"\nTotal images found: {len(cleaned_images)}", "DEBUG")
-    return cleaned_images[:20]  # Return max 20 images
+    return cleaned_images.urls()
+
+def _description_table(heading, header_cells, rows):
+    """HTML lines for one two-column description table"""
+    parts = [
+        f'<h3>{heading}</h3>',
+        '<table border="1" cellpadding="5" cellspacing="0" style="border-collapse: collapse; width: 100%; margin-bottom: 20px;">',
+        f'<tr><th style="background-color: #f5f5f5; padding: 8px;">{header_cells[0]}</th><th style="background-color: #f5f5f5; padding: 8px;">{header_cells[1]}</th></tr>'
+    ]
+    for name, value in rows:
+        parts.append(f'<tr><td style="padding: 8px;"><strong>{name}</strong></td><td style="padding: 8px;">{value}</td></tr>')
+    parts.append('</table>')
+    return parts
+
+def _json_scalar(value):
+    """Render a JSON value as table text; nested objects become 'key: value' lists"""
+    if isinstance(value, dict):
+        return ', '.join(f"{k}: {v}" for k, v in value.items() if isinstance(v, (str, int, float)) and str(v).strip())
+    if isinstance(value, list):
+        return ', '.join(str(v) for v in value if isinstance(v, (str, int, float)) and str(v).strip())
+    if isinstance(value, bool) or value is None:
+        return ''
+    return str(value).strip()
+
+OFFER_DETAIL_FIELDS = [
+    ('title', '产品标题 (Title)'),
+    ('seller', '卖家 (Seller)'),
+    ('company', '公司 (Company)'),
+    ('promotion', '促销信息 (Promotion)'),
+    ('services', '服务 (Services)')
+]
+
+PACK_INFO_FIELDS = [
+    ('uiType', '包装类型'),
+    ('label', '包装标签'),
+    ('sku', 'SKU信息'),
+    ('sku1', 'SKU详情1'),
+    ('sku2', 'SKU详情2')
+]
 
-def extract_description_from_feature_attributes(html_content):
+ADDITIONAL_INFO_FIELDS = [
+    ('productInfo', '产品信息 (Product Information)'),
+    ('specification', '规格参数 (Specifications)'),
+    ('material', '材质 (Material)'),
+    ('brand', '品牌 (Brand)'),
+    ('model', '型号 (Model)'),
+    ('color', '颜色 (Color)'),
+    ('size', '尺寸 (Size)'),
+    ('weight', '重量 (Weight)'),
+    ('origin', '产地 (Origin)'),
+    ('warranty', '保修 (Warranty)'),
+    ('subject', '产品标题 (Product Title)'),
+    ('companyName', '公司名称 (Company Name)'),
+    ('sellerLoginId', '卖家 (Seller)'),
+    ('leafCategoryName', '产品类别 (Category)'),
+    ('saleCount', '销量 (Sales Count)'),
+    ('unit', '单位 (Unit)')
+]
+# Fields of ADDITIONAL_INFO_FIELDS holding objects and counts; the others hold strings
+ADDITIONAL_INFO_OBJECT_FIELDS = ('productInfo', 'specification')
+ADDITIONAL_INFO_COUNT_FIELDS = ('saleCount',)
+
+def extract_description_from_feature_attributes(html_content, page_json=None):
     """Extract product description and create structured HTML tables from 1688 JSON data"""
+    page_json = page_json or parse_page_json(html_content)
+    if not page_json.blobs:
+        return extract_description_from_feature_attributes_regex(html_content)
+    
+    try:
+        html_parts = []
+        
+        # Product details from offerDetail
+        offer_details = [d for d in page_json.values('offerDetail') if isinstance(d, dict)]
+        if offer_details:
+            log(f"Found {len(offer_details)} offerDetail sections")
+        for detail in offer_details:
+            rows = [(label, detail[field]) for field, label in OFFER_DETAIL_FIELDS
+                    if isinstance(detail.get(field), str) and detail[field]]
+            if rows:
+                html_parts.extend(_description_table('商品详情 (Product Details)', ('项目 (Item)', '详情 (Details)'), rows))
+        
+        # Product attributes from featureAttributes
+        feature_sections = [f for f in page_json.values('featureAttributes') if isinstance(f, list)]
+        if feature_sections:
+            log(f"Found {len(feature_sections)} featureAttributes sections")
+        for i, section in enumerate(feature_sections):
+            attributes = []
+            for attr in section:
+                if not isinstance(attr, dict):
+                    continue
+                name = _json_scalar(attr.get('name'))
+                value = _json_scalar(attr.get('value', attr.get('values')))
+                if name and value:
+                    attributes.append((name, value))
+                    log(f"Attribute {len(attributes)}: {name} = {value}")
+            if attributes:
+                html_parts.extend(_description_table('商品属性 (Product Attributes)', ('属性 (Attribute)', '值 (Value)'), attributes))
+                log(f"Extracted {len(attributes)} product attributes")
+            else:
+                log(f"No attributes found in featureAttributes section {i+1}")
+        
+        # Packaging information from productPackInfo
+        for pack in page_json.values('productPackInfo'):
+            if not isinstance(pack, dict):
+                continue
+            pack_attributes = []
+            if isinstance(pack.get('unitWeight'), (int, float, str)) and str(pack['unitWeight']).strip():
+                pack_attributes.append(("商品件重尺", f"{pack['unitWeight']} kg"))
+            for field, label in PACK_INFO_FIELDS:
+                if isinstance(pack.get(field), str) and pack[field]:
+                    pack_attributes.append((label, pack[field]))
+            if pack_attributes:
+                html_parts.extend(_description_table('包装信息 (Packaging Information)', ('包装项目 (Packaging Item)', '规格 (Specification)'), pack_attributes))
+                log(f"Extracted {len(pack_attributes)} packaging attributes")
+        
+        # Additional product information
+        additional_info = []
+        for field, label in ADDITIONAL_INFO_FIELDS:
+            for value in page_json.values(field):
+                # Same value types the page exposes for these fields: objects for
+                # productInfo/specification, a count for saleCount, strings otherwise
+                if field in ADDITIONAL_INFO_OBJECT_FIELDS:
+                    valid = isinstance(value, dict)
+                elif field in ADDITIONAL_INFO_COUNT_FIELDS:
+                    valid = isinstance(value, int) and not isinstance(value, bool) or (isinstance(value, str) and value.isdigit())
+                else:
+                    valid = isinstance(value, str)
+                text = _json_scalar(value) if valid else ''
+                if text:
+                    additional_info.append((label, text))
+        if additional_info:
+            html_parts.extend(_description_table('其他信息 (Additional Information)', ('信息类型 (Info Type)', '详情 (Details)'), additional_info))
+        
+        # Combine all parts
+        if html_parts:
+            full_description = '\n'.join(html_parts)
+            log(f"Created structured description with {len(html_parts)} sections")
+            return full_description
+        
+        # Embedded data may also live in script that is not strict JSON
+        log("No structured data found in embedded JSON, trying regex extraction")
+        return extract_description_from_feature_attributes_regex(html_content)
+            
+    except Exception as e:
+        log(f"Error extracting structured description: {str(e)}")
+        return ""
+
+# Patterns of the regex fallback for featureAttributes descriptions
+OFFER_DETAIL_RE = REGEXES.compile('feature_attributes.offer_detail', r'\"offerDetail\":\s*\{([^}]+)\}', re.DOTALL)
+OFFER_DETAIL_FIELD_RES = {
+    field: REGEXES.compile(f'feature_attributes.offer_detail.{field}', rf'\"{field}\":\s*\"([^\"]+)\"')
+    for field in ('title', 'seller', 'company', 'promotion', 'services')
+}
+FEATURE_ATTRIBUTES_RE = REGEXES.compile('feature_attributes.section', r'\"featureAttributes\":\s*\[(.*?)\]', re.DOTALL)
+FEATURE_ATTRIBUTE_OBJECT_RE = REGEXES.compile('feature_attributes.object', r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}')
+FEATURE_ATTRIBUTE_NAME_RE = REGEXES.compile('feature_attributes.name', r'\"name\":\s*\"([^\"]+)\"')
+FEATURE_ATTRIBUTE_VALUE_RE = REGEXES.compile('feature_attributes.value', r'\"value\":\s*\"([^\"]+)\"')
+PACK_INFO_RE = REGEXES.compile('feature_attributes.pack', r'\"productPackInfo\":\s*\{([^}]+)\}', re.DOTALL)
+PACK_UNIT_WEIGHT_RE = REGEXES.compile('feature_attributes.pack.unitWeight', r'\"unitWeight\":\s*([0-9.]+)')
+PACK_FIELD_RES = [
+    (REGEXES.compile(f'feature_attributes.pack.{field}', rf'\"{field}\":\s*\"([^\"]+)\"'), label)
+    for field, label in PACK_INFO_FIELDS
+]
+ADDITIONAL_INFO_RES = [
+    (REGEXES.compile(f'feature_attributes.additional.{field}',
+                     rf'\"{field}\":\s*' + (r'\{([^}]+)\}' if field in ADDITIONAL_INFO_OBJECT_FIELDS
+                                          else r'([0-9]+)' if field in ADDITIONAL_INFO_COUNT_FIELDS
+                                          else r'\"([^\"]+)\"'),
+                     re.DOTALL), label)
+    for field, label in ADDITIONAL_INFO_FIELDS
+]
+
+def extract_description_from_feature_attributes_regex(html_content):
+    """Regex fallback for extract_description_from_feature_attributes when the page has no parseable JSON"""
     try:
         html_parts = []
         
         # Extract product details from offerDetail
-        offer_detail_pattern = r'\"offerDetail\":\s*\{([^}]+)\}'
-        offer_detail_matches = re.findall(offer_detail_pattern, html_content, re.DOTALL)
+        offer_detail_matches = OFFER_DETAIL_RE.findall(html_content)
         
         if offer_detail_matches:
             log(f"Found {len(offer_detail_matches)} offerDetail sections")
             
             for i, match in enumerate(offer_detail_matches):
                 # Extract title, seller, company, promotion, services
-                title_match = re.search(r'\"title\":\s*\"([^\"]+)\"', match)
-                seller_match = re.search(r'\"seller\":\s*\"([^\"]+)\"', match)
-                company_match = re.search(r'\"company\":\s*\"([^\"]+)\"', match)
-                promotion_match = re.search(r'\"promotion\":\s*\"([^\"]+)\"', match)
-                services_match = re.search(r'\"services\":\s*\"([^\"]+)\"', match)
+                title_match = OFFER_DETAIL_FIELD_RES['title'].search(match)
+                seller_match = OFFER_DETAIL_FIELD_RES['seller'].search(match)
+                company_match = OFFER_DETAIL_FIELD_RES['company'].search(match)
+                promotion_match = OFFER_DETAIL_FIELD_RES['promotion'].search(match)
+                services_match = OFFER_DETAIL_FIELD_RES['services'].search(match)
                 
                 if title_match or seller_match or company_match or promotion_match or services_match:
                     html_parts.append('<h3>商品详情 (Product Details)</h3>')
@@ -444,8 +1175,7 @@ def extract_description_from_feature_attributes(html_content):
                     html_parts.append('</table>')
         
         # Extract product attributes from featureAttributes - Improved parsing
-        feature_pattern = r'\"featureAttributes\":\s*\[(.*?)\]'
-        feature_matches = re.findall(feature_pattern, html_content, re.DOTALL)
+        feature_matches = FEATURE_ATTRIBUTES_RE.findall(html_content)
         
         if feature_matches:
             log(f"Found {len(feature_matches)} featureAttributes sections")
@@ -455,15 +1185,15 @@ def extract_description_from_feature_attributes(html_content):
                 
                 # Extract individual attribute objects with better pattern
                 # Look for complete attribute objects with nested structure
-                attr_objects = re.findall(r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}', match)
+                attr_objects = FEATURE_ATTRIBUTE_OBJECT_RE.findall(match)
                 attributes = []
                 
                 log(f"Found {len(attr_objects)} attribute objects")
                 
                 for j, attr_obj in enumerate(attr_objects):
                     # Extract name and value from each attribute object
-                    name_match = re.search(r'\"name\":\s*\"([^\"]+)\"', attr_obj)
-                    value_match = re.search(r'\"value\":\s*\"([^\"]+)\"', attr_obj)
+                    name_match = FEATURE_ATTRIBUTE_NAME_RE.search(attr_obj)
+                    value_match = FEATURE_ATTRIBUTE_VALUE_RE.search(attr_obj)
                     
                     if name_match and value_match:
                         name = name_match.group(1)
@@ -486,8 +1216,7 @@ def extract_description_from_feature_attributes(html_content):
                     log("No attributes found in featureAttributes section")
         
         # Extract packaging information from productPackInfo - Improved parsing
-        pack_pattern = r'\"productPackInfo\":\s*\{([^}]+)\}'
-        pack_matches = re.findall(pack_pattern, html_content, re.DOTALL)
+        pack_matches = PACK_INFO_RE.findall(html_content)
         
         if pack_matches:
             log(f"Found {len(pack_matches)} productPackInfo sections")
@@ -497,21 +1226,13 @@ def extract_description_from_feature_attributes(html_content):
                 pack_attributes = []
                 
                 # Look for specific packaging fields
-                unit_weight_match = re.search(r'\"unitWeight\":\s*([0-9.]+)', match)
+                unit_weight_match = PACK_UNIT_WEIGHT_RE.search(match)
                 if unit_weight_match:
                     pack_attributes.append(("商品件重尺", f"{unit_weight_match.group(1)} kg"))
                 
                 # Look for other packaging fields
-                pack_fields = [
-                    ('uiType', '包装类型'),
-                    ('label', '包装标签'),
-                    ('sku', 'SKU信息'),
-                    ('sku1', 'SKU详情1'),
-                    ('sku2', 'SKU详情2')
-                ]
-                
-                for field, label in pack_fields:
-                    field_match = re.search(f'\"{field}\":\s*\"([^\"]+)\"', match)
+                for field_re, label in PACK_FIELD_RES:
+                    field_match = field_re.search(match)
                     if field_match:
                         pack_attributes.append((label, field_match.group(1)))
                 
@@ -527,28 +1248,9 @@ def extract_description_from_feature_attributes(html_content):
                     log(f"Extracted {len(pack_attributes)} packaging attributes")
         
         # Extract additional product information from other JSON structures
-        additional_patterns = [
-            (r'\"productInfo\":\s*\{([^}]+)\}', '产品信息 (Product Information)'),
-            (r'\"specification\":\s*\{([^}]+)\}', '规格参数 (Specifications)'),
-            (r'\"material\":\s*\"([^\"]+)\"', '材质 (Material)'),
-            (r'\"brand\":\s*\"([^\"]+)\"', '品牌 (Brand)'),
-            (r'\"model\":\s*\"([^\"]+)\"', '型号 (Model)'),
-            (r'\"color\":\s*\"([^\"]+)\"', '颜色 (Color)'),
-            (r'\"size\":\s*\"([^\"]+)\"', '尺寸 (Size)'),
-            (r'\"weight\":\s*\"([^\"]+)\"', '重量 (Weight)'),
-            (r'\"origin\":\s*\"([^\"]+)\"', '产地 (Origin)'),
-            (r'\"warranty\":\s*\"([^\"]+)\"', '保修 (Warranty)'),
-            (r'\"subject\":\s*\"([^\"]+)\"', '产品标题 (Product Title)'),
-            (r'\"companyName\":\s*\"([^\"]+)\"', '公司名称 (Company Name)'),
-            (r'\"sellerLoginId\":\s*\"([^\"]+)\"', '卖家 (Seller)'),
-            (r'\"leafCategoryName\":\s*\"([^\"]+)\"', '产品类别 (Category)'),
-            (r'\"saleCount\":\s*([0-9]+)', '销量 (Sales Count)'),
-            (r'\"unit\":\s*\"([^\"]+)\"', '单位 (Unit)')
-        ]
-        
         additional_info = []
-        for pattern, label in additional_patterns:
-            matches = re.findall(pattern, html_content, re.DOTALL)
+        for pattern, label in ADDITIONAL_INFO_RES:
+            matches = pattern.findall(html_content)
             for match in matches:
                 if match and len(match.strip()) > 0:
                     additional_info.append((label, match))
@@ -576,81 +1278,338 @@ def extract_description_from_feature_attributes(html_content):
         log(f"Error extracting structured description: {str(e)}")
         return ""
 
-def extract_description_from_detail_url(html_content):
-    """Extract product description from detailUrl HTML content with enhanced parsing"""
+class StageStats:
+    """Thread-safe wall-time totals per pipeline stage, reported at the end of a run"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stages = {}
+
+    def record(self, stage, seconds, **counters):
+        with self._lock:
+            entry = self.stages.setdefault(stage, {'calls': 0, 'seconds': 0.0, 'max_seconds': 0.0})
+            entry['calls'] += 1
+            entry['seconds'] += seconds
+            entry['max_seconds'] = max(entry['max_seconds'], seconds)
+            for name, value in counters.items():
+                entry[name] = entry.get(name, 0) + value
+
+    def report(self):
+        with self._lock:
+            return {stage: dict(entry) for stage, entry in self.stages.items()}
+
+    def reset(self):
+        with self._lock:
+            self.stages = {}
+
+STAGE_STATS = StageStats()
+
+# A strategy with at least this many attempts and a lower success rate is
+# tried only after every other strategy of its field
+EXTRACTOR_MIN_SAMPLES = 20
+EXTRACTOR_DEMOTE_BELOW = 0.05
+
+class ExtractorStrategy:
+    """One way of extracting a product field, with its measured cost and success rate"""
+    def __init__(self, name, extract, tier=0, network=False):
+        self.name = name
+        self.extract = extract
+        self.tier = tier
+        self.network = network
+        self.calls = 0
+        self.successes = 0
+        self.seconds = 0.0
+
+    @property
+    def success_rate(self):
+        # Laplace-smoothed so unmeasured strategies start at 50%
+        return (self.successes + 1) / (self.calls + 2)
+
+    @property
+    def cost_per_success(self):
+        mean_cost = self.seconds / self.calls if self.calls else 0.0
+        return mean_cost / self.success_rate
+
+    @property
+    def demoted(self):
+        return (self.calls >= EXTRACTOR_MIN_SAMPLES
+                and self.successes / self.calls < EXTRACTOR_DEMOTE_BELOW)
+
+    def sort_key(self):
+        return (self.demoted, self.tier, self.cost_per_success)
+
+class ExtractorChain:
+    """Declarative extraction cascade for one product field.
+
+    Strategies are tried tier by tier (lower tiers give the preferred result)
+    and, within a tier, cheapest per success first; the chain stops as soon as
+    the field meets its quality bar. Costs and success rates are measured over
+    the whole run, so strategies that keep failing sink to the end.
+    
+    Chains that accumulate one result from several strategies (images) always
+    run in tier order: reordering them would change the result, and with it
+    the output, depending on earlier pages and timing.
+    """
+    def __init__(self, field, good_enough=bool, accumulates=False):
+        self.field = field
+        self.good_enough = good_enough
+        self.accumulates = accumulates
+        self.strategies = []
+        self._lock = threading.Lock()
+        EXTRACTOR_CHAINS[field] = self
+
+    def strategy(self, name, tier=0, network=False):
+        """Decorator registering an extract(page[, result]) function as a strategy"""
+        def register(extract):
+            self.strategies.append(ExtractorStrategy(name, extract, tier, network))
+            return extract
+        return register
+
+    def strategy_named(self, name):
+        return next(strategy for strategy in self.strategies if strategy.name == name)
+
+    def ordered(self):
+        if self.accumulates:
+            # Stable: registration order within a tier
+            return sorted(self.strategies, key=lambda strategy: strategy.tier)
+        with self._lock:
+            return sorted(self.strategies, key=ExtractorStrategy.sort_key)
+
+    def run(self, page, result=None):
+        """Extract the field from a ParsedPage.
+
+        Without `result` each strategy returns a candidate value and the first
+        one meeting the quality bar wins (else the first non-empty one). With
+        `result` (an accumulating field such as images) each strategy adds to
+        it and returns how much it added.
+        """
+        accumulate = result is not None
+        for strategy in self.ordered():
+            if strategy.network and page.offline:
+                page.deferred.append((self.field, strategy.name))
+                continue
+            started = time.perf_counter()
+            try:
+                value = strategy.extract(page, result) if accumulate else strategy.extract(page)
+            except Exception as e:
+                log(f"{self.field} strategy '{strategy.name}' failed: {e}", "WARNING")
+                value = None
+            elapsed = time.perf_counter() - started
+            self.record(strategy, elapsed, bool(value))
+            page.extractions.append((self.field, strategy.name, elapsed, bool(value)))
+            if not accumulate and value:
+                if self.good_enough(value):
+                    return value
+                result = result or value
+            if accumulate and self.good_enough(result):
+                break
+        return result
+
+    def record(self, strategy, seconds, success):
+        with self._lock:
+            strategy.calls += 1
+            strategy.successes += int(success)
+            strategy.seconds += seconds
+
+    def report(self):
+        """Per-strategy stats in the order the chain would run them now"""
+        return [{'strategy': strategy.name, 'tier': strategy.tier, 'calls': strategy.calls,
+                 'successes': strategy.successes, 'seconds': strategy.seconds,
+                 'demoted': strategy.demoted and not self.accumulates}
+                for strategy in self.ordered()]
+
+    def reset(self):
+        with self._lock:
+            for strategy in self.strategies:
+                strategy.calls = strategy.successes = 0
+                strategy.seconds = 0.0
+
+EXTRACTOR_CHAINS = {}
+
+# Cap on the description text built from a detailUrl page (characters)
+DETAIL_DESCRIPTION_MAX_CHARS = 20000
+
+# Selectors for description content on detailUrl pages, in priority order, as
+# (tag name or None, attribute, value, match): 'token' matches one class name,
+# 'contains' a substring of the attribute, 'equals' the whole value
+DETAIL_DESCRIPTION_SELECTORS = [
+    (None, 'class', 'detail-content', 'token'),        # .detail-content
+    (None, 'class', 'product-description', 'token'),   # .product-description
+    (None, 'class', 'description-content', 'token'),   # .description-content
+    (None, 'class', 'detail-desc', 'token'),           # .detail-desc
+    (None, 'id', 'description', 'equals'),             # #description
+    (None, 'class', 'html-description', 'token'),      # .html-description
+    ('div', 'class', 'desc', 'contains'),              # div[class*="desc"]
+    ('div', 'class', 'detail', 'contains'),            # div[class*="detail"]
+    (None, 'class', 'content', 'token'),               # .content
+    (None, 'class', 'text', 'token'),                  # .text
+    ('p', None, None, None),                           # p
+    ('div', None, None, None),                         # div
+]
+
+DETAIL_DATA_ATTRIBUTES = ('data-content', 'data-description', 'data-text', 'data-detail')
+
+def _detail_selector_rank(tag):
+    """Index of the first DETAIL_DESCRIPTION_SELECTORS entry matching tag, or None"""
+    for rank, (name, attr, value, match) in enumerate(DETAIL_DESCRIPTION_SELECTORS):
+        if name and tag.name != name:
+            continue
+        if attr is None:
+            return rank
+        attr_value = tag.get(attr)
+        if attr_value is None:
+            continue
+        if isinstance(attr_value, (list, tuple)):
+            tokens = attr_value
+            attr_value = ' '.join(attr_value)
+        else:
+            tokens = attr_value.split()
+        if (match == 'token' and value in tokens) or (match == 'contains' and value in attr_value) or \
+           (match == 'equals' and attr_value == value):
+            return rank
+    return None
+
+DETAIL_JSON_TEXT_RES = [
+    REGEXES.compile(f'detail_description.json.{field}', rf'"{field}":"([^"]+)"')
+    for field in ('description', 'content', 'text', 'detail')
+]
+
+def extract_description_from_detail_url(html_content, max_chars=None):
+    """Extract product description from detailUrl HTML content with enhanced parsing.
+    
+    One walk over the tree collects the selector matches, data attributes,
+    title and meta description; texts are de-duplicated with a set and the
+    result is capped at max_chars (DETAIL_DESCRIPTION_MAX_CHARS by default).
+    """
+    started = time.perf_counter()
+    max_chars = max_chars or DETAIL_DESCRIPTION_MAX_CHARS
+    capped = False
     try:
-        soup = BeautifulSoup(html_content, 'html.parser')
+        soup = make_soup(html_content)
         description_parts = []
+        seen = set()
+        total_chars = 0
+        
+        def add_part(part):
+            nonlocal total_chars, capped
+            if part in seen:
+                return True
+            # Separators between parts count towards the cap
+            remaining = max_chars - total_chars - (3 if description_parts else 0)
+            if remaining <= 0:
+                capped = True
+                return False
+            if len(part) > remaining:
+                part = part[:remaining]
+                capped = True
+            seen.add(part)
+            description_parts.append(part)
+            total_chars += len(part) + (3 if len(description_parts) > 1 else 0)
+            return not capped
         
         # Method 1: Try to extract from JSON data in detailUrl content
-        json_patterns = [
-            r'"description":"([^"]+)"',
-            r'"content":"([^"]+)"',
-            r'"text":"([^"]+)"',
-            r'"detail":"([^"]+)"'
-        ]
-        
-        for pattern in json_patterns:
-            matches = re.findall(pattern, html_content)
-            for match in matches:
+        json_parts = []
+        for pattern in DETAIL_JSON_TEXT_RES:
+            for match in pattern.findall(html_content):
                 if len(match) > 20:  # Minimum meaningful content
-                    description_parts.append(match)
-                    log(f"Found description in JSON: {len(match)} characters")
-        
-        # Method 2: Try multiple selectors for description content
-        desc_selectors = [
-            '.detail-content',
-            '.product-description',
-            '.description-content',
-            '.detail-desc',
-            '#description',
-            '.html-description',
-            'div[class*="desc"]',
-            'div[class*="detail"]',
-            '.content',
-            '.text',
-            'p',
-            'div'
-        ]
+                    json_parts.append(match)
+        if json_parts:
+            log(f"Found {len(json_parts)} descriptions in JSON")
+        
+        # Methods 2-4 in one walk: selector matches (grouped by selector priority),
+        # description data attributes, the title and the meta description.
+        # The walk also collects the stripped strings get_text(strip=True) would
+        # join, so each tag's text is a slice of them instead of a subtree walk.
+        matches_by_rank = [[] for _ in DETAIL_DESCRIPTION_SELECTORS]
+        attribute_parts = []
+        title_tag = None
+        meta_desc = None
+        text_types = soup.new_tag('div').interesting_string_types
+        if isinstance(text_types, type):
+            text_types = (text_types,)
+        strings = []
+        string_offsets = [0]
+        first_string = {}
+        nodes = list(soup.descendants)
+        for tag in nodes:
+            if isinstance(tag, NavigableString):
+                if type(tag) in text_types:
+                    stripped = tag.strip()
+                    if stripped:
+                        strings.append(stripped)
+                        string_offsets.append(string_offsets[-1] + len(stripped))
+                continue
+            first_string[id(tag)] = len(strings)
+            rank = _detail_selector_rank(tag)
+            if rank is not None:
+                matches_by_rank[rank].append(tag)
+            if tag.name in ('div', 'p', 'span', 'section'):
+                for attr in DETAIL_DATA_ATTRIBUTES:
+                    content = tag.get(attr)
+                    if content and len(content) > 20:
+                        attribute_parts.append(content)
+            if tag.name == 'title' and title_tag is None:
+                title_tag = tag
+            elif tag.name == 'meta' and meta_desc is None and tag.get('name') == 'description':
+                meta_desc = tag
+        
+        # Post-order pass: number of collected strings inside each tag
+        string_counts = {}
+        for node in reversed(nodes):
+            if isinstance(node, NavigableString):
+                string_counts[id(node)] = 1 if type(node) in text_types and node.strip() else 0
+            else:
+                string_counts[id(node)] = sum(string_counts[id(child)] for child in node.contents)
         
-        for selector in desc_selectors:
-            elements = soup.select(selector)
+        # Stops adding parts once the cap is reached
+        open_for_parts = all(add_part(part) for part in json_parts)
+        
+        # Method 2: Selector matches, in selector priority order
+        seen_ranges = set()
+        for rank, elements in enumerate(matches_by_rank):
+            if not open_for_parts:
+                break
+            found = 0
             for element in elements:
-                # Get text content
-                text_content = element.get_text(strip=True)
+                if element.interesting_string_types != text_types:
+                    # e.g. script/style tags, whose own strings are their text
+                    text_content = element.get_text(strip=True)
+                else:
+                    start = first_string[id(element)]
+                    end = start + string_counts[id(element)]
+                    # Wrappers around the same strings have the same text
+                    if (start, end) in seen_ranges:
+                        continue
+                    seen_ranges.add((start, end))
+                    if string_offsets[end] - string_offsets[start] <= 50:
+                        continue
+                    text_content = ''.join(strings[start:end])
                 if len(text_content) > 50:  # Minimum meaningful content
                     # Clean up the text
-                    text_content = re.sub(r'\s+', ' ', text_content)  # Remove extra whitespace
-                    text_content = text_content.strip()
-                    
-                    if text_content and text_content not in description_parts:
-                        description_parts.append(text_content)
-                        log(f"Found description using selector '{selector}': {len(text_content)} characters")
+                    text_content = re.sub(r'\s+', ' ', text_content).strip()
+                    if text_content and text_content not in seen:
+                        found += 1
+                        if not add_part(text_content):
+                            open_for_parts = False
+                            break
+            if found:
+                log(f"Found {found} descriptions using selector #{rank}")
         
         # Method 3: Extract from HTML attributes that might contain descriptions
-        for tag in soup.find_all(['div', 'p', 'span', 'section']):
-            # Check data attributes
-            for attr in ['data-content', 'data-description', 'data-text', 'data-detail']:
-                if tag.has_attr(attr):
-                    content = tag[attr]
-                    if len(content) > 20:
-                        description_parts.append(content)
-                        log(f"Found description in data attribute '{attr}': {len(content)} characters")
+        if open_for_parts and attribute_parts:
+            log(f"Found {len(attribute_parts)} descriptions in data attributes")
+            open_for_parts = all(add_part(part) for part in attribute_parts)
         
         # Method 4: Extract from title and meta tags
-        title_tag = soup.find('title')
-        if title_tag and title_tag.text:
+        if open_for_parts and title_tag and title_tag.text:
             title_text = title_tag.text.strip()
             if len(title_text) > 10:
-                description_parts.append(f"Title: {title_text}")
+                open_for_parts = add_part(f"Title: {title_text}")
                 log(f"Added title: {title_text}")
         
-        # Check meta description
-        meta_desc = soup.find('meta', attrs={'name': 'description'})
-        if meta_desc and meta_desc.get('content'):
+        if open_for_parts and meta_desc and meta_desc.get('content'):
             desc_content = meta_desc['content'].strip()
             if len(desc_content) > 20:
-                description_parts.append(desc_content)
+                add_part(desc_content)
                 log(f"Added meta description: {len(desc_content)} characters")
         
         # Method 5: Fallback: extract all meaningful text from body
@@ -663,19 +1622,14 @@ def extract_description_from_detail_url(html_content):
                 
                 # Take first 2000 characters
                 body_text = body_text[:2000]
-                description_parts.append(body_text)
+                add_part(body_text)
                 log(f"Using fallback: extracted all text from body: {len(body_text)} characters")
         
         if description_parts:
-            # Remove duplicates while preserving order
-            unique_parts = []
-            for part in description_parts:
-                if part not in unique_parts:
-                    unique_parts.append(part)
-            
             # Join with separator
-            result = " | ".join(unique_parts)
-            log(f"Successfully extracted description from detailUrl with {len(unique_parts)} parts")
+            result = " | ".join(description_parts)
+            log(f"Successfully extracted description from detailUrl with {len(description_parts)} parts"
+                f"{' (capped at ' + str(max_chars) + ' characters)' if capped else ''}")
             return result
         else:
             log("No description content found in detailUrl", "WARNING")
@@ -684,6 +1638,8 @@ def extract_description_from_detail_url(html_content):
     except Exception as e:
         log(f"Error extracting description from detailUrl: {str(e)}", "ERROR")
         return None
+    finally:
+        STAGE_STATS.record('detail description', time.perf_counter() - started, capped=int(capped))
 
 class WooCommerceProduct:
     """Class to handle product data structure and WooCommerce formatting"""
@@ -793,41 +1749,414 @@ def clean_html(text):
         return ""
     return re.sub(r'<[^>]+>', '', text)
 
-def translate_text(text, from_lang='zh', to_lang='en'):
+# Translation services (functions of the translators package), in order of
+# preference; looked up at call time since not every translators release has all
+TRANSLATION_PROVIDERS = ['translate_text', 'google', 'bing']
+
+class CircuitOpenError(Exception):
+    """Raised when a provider's circuit breaker is not letting calls through"""
+
+class TranslationRouter:
+    """Picks the order in which translation providers are tried.
+    
+    Keeps a rolling (exponentially weighted) latency of successful calls and
+    error rate for each provider and tries the one with the lowest expected
+    time to a successful result first, charging every failure failure_penalty
+    seconds (about a request timeout) so fast failures do not look cheap;
+    unmeasured providers are tried early so every provider gets measured.
+    After failure_threshold consecutive failures a provider's circuit opens
+    and it is skipped for cooldown seconds, then a single trial call decides
+    whether it comes back.
+    """
+    def __init__(self, providers, failure_threshold=3, cooldown=60.0, alpha=0.3, failure_penalty=10.0):
+        self.providers = list(providers)
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.failure_penalty = failure_penalty
+        self.alpha = alpha
+        self._lock = threading.Lock()
+        self._stats = {}
+        self.reset()
+
+    def configure(self, settings):
+        self.failure_threshold = max(1, int(settings.get('failure_threshold', 3)))
+        self.cooldown = max(0.0, float(settings.get('cooldown', 60)))
+        self.failure_penalty = max(0.0, float(settings.get('failure_penalty', 10)))
+
+    def reset(self):
+        with self._lock:
+            self._stats = {
+                name: {'calls': 0, 'failures': 0, 'latency': None, 'error_rate': 0.0,
+                       'consecutive_failures': 0, 'open_until': 0.0, 'trial': False, 'opened': 0}
+                for name in self.providers
+            }
+
+    def _expected_cost(self, entry):
+        if not entry['calls']:
+            return 0.0
+        # Until a call succeeds its latency is assumed to be the penalty
+        latency = self.failure_penalty if entry['latency'] is None else entry['latency']
+        error_rate = entry['error_rate']
+        attempt = (1.0 - error_rate) * latency + error_rate * self.failure_penalty
+        return attempt / max(1.0 - error_rate, 0.05)
+
+    def ordered(self):
+        """Providers to try, best first; providers with an open circuit are left out"""
+        now = time.monotonic()
+        with self._lock:
+            available = [
+                (self._expected_cost(entry), index, name)
+                for index, (name, entry) in enumerate(self._stats.items())
+                if entry['open_until'] <= now and not entry['trial']
+            ]
+        return [name for _, _, name in sorted(available)]
+
+    def call(self, name, text, from_lang, to_lang, segments=1):
+        """Call a provider (a translators function) and record how it went.
+        
+        A batched call carries several segments; its latency is recorded per
+        segment so it compares with single-segment calls to other providers.
+        """
+        with self._lock:
+            entry = self._stats[name]
+            if entry['open_until']:
+                # Half-open: only one trial call at a time
+                if entry['open_until'] > time.monotonic() or entry['trial']:
+                    raise CircuitOpenError(f"{name} is temporarily disabled")
+                entry['trial'] = True
+        started = time.perf_counter()
+        try:
+            translated = getattr(ts, name)(text, from_language=from_lang, to_language=to_lang)
+        except Exception:
+            self._record(name, (time.perf_counter() - started) / segments, False)
+            raise
+        self._record(name, (time.perf_counter() - started) / segments,
+                     isinstance(translated, str) and bool(translated.strip()))
+        return translated
+
+    def _record(self, name, seconds, success):
+        with self._lock:
+            entry = self._stats[name]
+            entry['calls'] += 1
+            # Failures often return fast; only successful calls measure latency
+            if success:
+                if entry['latency'] is None:
+                    entry['latency'] = seconds
+                else:
+                    entry['latency'] += self.alpha * (seconds - entry['latency'])
+            entry['error_rate'] += self.alpha * ((0.0 if success else 1.0) - entry['error_rate'])
+            was_open = bool(entry['open_until'])
+            entry['trial'] = False
+            if success:
+                entry['consecutive_failures'] = 0
+                entry['open_until'] = 0.0
+                if was_open:
+                    log(f"Translation provider {name} is working again", "INFO")
+                return
+            entry['failures'] += 1
+            entry['consecutive_failures'] += 1
+            if was_open or entry['consecutive_failures'] >= self.failure_threshold:
+                entry['open_until'] = time.monotonic() + self.cooldown
+                entry['opened'] += 1
+                log(f"Translation provider {name} failed {entry['consecutive_failures']} times in a row, "
+                    f"skipping it for {self.cooldown:.0f}s", "WARNING")
+
+    def report(self):
+        with self._lock:
+            return {name: dict(entry) for name, entry in self._stats.items()}
+
+TRANSLATION_ROUTER = TranslationRouter(TRANSLATION_PROVIDERS)
+
+
+class TranslationCache:
+    """Persistent translation memory in SQLite.
+    
+    Entries are keyed by source text, language pair and provider. A lookup
+    returns the translation of the first provider (in TRANSLATION_PROVIDERS
+    order) that has one. Beyond max_entries the least recently used entries
+    are evicted.
+    """
+    # Puts between checks of the entry count
+    PRUNE_EVERY = 500
+
+    def __init__(self, db_path, max_entries=200000, enabled=True):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._conn = None
+        self._puts_since_prune = 0
+        self.stats = {'hits': 0, 'misses': 0, 'stored': 0, 'evicted': 0}
+
+    def configure(self, settings):
+        self.enabled = bool(settings.get('enabled', True))
+        self.max_entries = max(1, int(settings.get('max_entries', 200000)))
+
+    def _connection(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS translations ('
+                ' source_key TEXT NOT NULL, provider TEXT NOT NULL,'
+                ' from_lang TEXT NOT NULL, to_lang TEXT NOT NULL,'
+                ' source TEXT NOT NULL, translated TEXT NOT NULL, last_used REAL NOT NULL,'
+                ' PRIMARY KEY (source_key, provider))'
+            )
+            self._conn.execute('CREATE INDEX IF NOT EXISTS translations_last_used ON translations (last_used)')
+        return self._conn
+
+    @staticmethod
+    def _key(text, from_lang, to_lang):
+        return hashlib.sha256(f'{from_lang}\0{to_lang}\0{text}'.encode('utf-8')).hexdigest()
+
+    def lookup(self, text, from_lang, to_lang):
+        """Return (provider, translation) for cached text, or (None, None)"""
+        if not self.enabled:
+            return None, None
+        key = self._key(text, from_lang, to_lang)
+        try:
+            with self._lock:
+                conn = self._connection()
+                rows = dict(conn.execute(
+                    'SELECT provider, translated FROM translations WHERE source_key = ? AND source = ?',
+                    (key, text)
+                ).fetchall())
+                for provider in TRANSLATION_PROVIDERS + sorted(set(rows) - set(TRANSLATION_PROVIDERS)):
+                    if provider in rows:
+                        # Committed with the next store (or on close)
+                        conn.execute('UPDATE translations SET last_used = ? WHERE source_key = ? AND provider = ?',
+                                     (time.time(), key, provider))
+                        self.stats['hits'] += 1
+                        return provider, rows[provider]
+                self.stats['misses'] += 1
+        except sqlite3.Error as e:
+            log(f"Translation cache lookup failed: {e}", "WARNING")
+        return None, None
+
+    def store(self, text, from_lang, to_lang, provider, translated):
+        """Save a provider's translation of text"""
+        if not self.enabled:
+            return
+        try:
+            with self._lock:
+                conn = self._connection()
+                conn.execute(
+                    'INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (self._key(text, from_lang, to_lang), provider, from_lang, to_lang, text, translated, time.time())
+                )
+                self.stats['stored'] += 1
+                self._puts_since_prune += 1
+                if self._puts_since_prune >= self.PRUNE_EVERY:
+                    self._prune(conn)
+                conn.commit()
+        except sqlite3.Error as e:
+            log(f"Failed to cache translation: {e}", "WARNING")
+
+    def _prune(self, conn):
+        """Evict least recently used entries beyond max_entries (lock held)"""
+        self._puts_since_prune = 0
+        excess = conn.execute('SELECT COUNT(*) FROM translations').fetchone()[0] - self.max_entries
+        if excess > 0:
+            conn.execute('DELETE FROM translations WHERE rowid IN '
+                         '(SELECT rowid FROM translations ORDER BY last_used LIMIT ?)', (excess,))
+            self.stats['evicted'] += excess
+
+    def close(self):
+        with self._lock:
+            if self._conn is None:
+                return
+            try:
+                self._prune(self._conn)
+                self._conn.commit()
+                self._conn.close()
+            except sqlite3.Error as e:
+                log(f"Failed to close translation cache: {e}", "WARNING")
+            self._conn = None
+
+TRANSLATION_CACHE = TranslationCache(os.path.join(CACHE_DIR, 'translations.sqlite3'))
+
+# Request size limits (characters) for batched translation, per provider
+TRANSLATION_BATCH_CHARS = {'bing': 1000}
+TRANSLATION_BATCH_DEFAULT_CHARS = 4500
+
+def pack_segments(segments, max_chars):
+    """Group segments in order into packs whose newline-joined length stays within max_chars"""
+    packs, pack, size = [], [], 0
+    for segment in segments:
+        if pack and size + 1 + len(segment) > max_chars:
+            packs.append(pack)
+            pack, size = [], 0
+        size += len(segment) + (1 if pack else 0)
+        pack.append(segment)
+    if pack:
+        packs.append(pack)
+    return packs
+
+class TranslationBatcher:
+    """Packs translation requests made concurrently by many products into few provider calls.
+    
+    The first caller for a language pair waits max_wait seconds while other
+    workers add their segments, then sends them newline-joined in as few
+    requests as each provider's size limit allows and hands every caller its
+    own line back. Segments containing a newline are not batched, and a pack
+    whose translation does not split into the same number of lines goes to
+    the next provider.
+    """
+    def __init__(self, max_wait=0.05, enabled=False):
+        self.max_wait = max_wait
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._pending = {}
+        self.stats = {'segments': 0, 'requests': 0, 'mismatched': 0}
+
+    def configure(self, settings, concurrent):
+        # With a single worker there is nothing to batch with
+        self.enabled = bool(settings.get('enabled', True)) and concurrent
+        self.max_wait = max(0.0, float(settings.get('max_wait_ms', 50)) / 1000)
+
+    def translate(self, text, from_lang, to_lang):
+        """Return (provider, translation) for text, or (None, None) if no provider managed it"""
+        if '\n' in text or '\r' in text:
+            return None, None
+        pair = (from_lang, to_lang)
+        with self._lock:
+            leader = pair not in self._pending
+            batch = self._pending.setdefault(pair, {})
+            future = batch.get(text)
+            if future is None:
+                future = batch[text] = Future()
+                self.stats['segments'] += 1
+        if leader:
+            time.sleep(self.max_wait)
+            with self._lock:
+                batch = self._pending.pop(pair)
+            self._send(batch, from_lang, to_lang)
+        return future.result()
+
+    def _send(self, batch, from_lang, to_lang):
+        """Translate every segment of a batch and resolve its futures"""
+        results = {}
+        try:
+            remaining = list(batch)
+            for name in TRANSLATION_ROUTER.ordered():
+                if not remaining:
+                    break
+                failed = []
+                max_chars = TRANSLATION_BATCH_CHARS.get(name, TRANSLATION_BATCH_DEFAULT_CHARS)
+                for pack in pack_segments(remaining, max_chars):
+                    translated = self._request(name, pack, from_lang, to_lang)
+                    if translated is None:
+                        failed.extend(pack)
+                        continue
+                    for source, result in zip(pack, translated):
+                        results[source] = (name, result)
+                remaining = failed
+        finally:
+            for text, future in batch.items():
+                future.set_result(results.get(text, (None, None)))
+
+    def _request(self, name, pack, from_lang, to_lang):
+        """One provider call for a pack; the translated lines, or None"""
+        with self._lock:
+            self.stats['requests'] += 1
+        try:
+            translated = TRANSLATION_ROUTER.call(name, '\n'.join(pack), from_lang, to_lang, segments=len(pack))
+        except Exception as e:
+            log(f"{name} batch translate failed ({len(pack)} segments): {str(e)}", "DEBUG")
+            return None
+        if not isinstance(translated, str):
+            return None
+        lines = [line.strip() for line in translated.splitlines() if line.strip()]
+        if len(lines) != len(pack):
+            with self._lock:
+                self.stats['mismatched'] += 1
+            log(f"{name} batch of {len(pack)} segments came back as {len(lines)} lines", "DEBUG")
+            return None
+        return lines
+
+TRANSLATION_BATCHER = TranslationBatcher()
+
+def translate_with_providers(text, to_lang, from_lang='zh', min_length=2):
+    """Translation of text from the cache or the first provider with a usable result.
+    
+    A result is usable if it is longer than min_length once stripped. Returns
+    the stripped translation, or None. Replay runs only consult the cache.
+    """
+    _, translated = TRANSLATION_CACHE.lookup(text, from_lang, to_lang)
+    if translated and len(translated) > min_length:
+        return translated
+    if REPLAY_SOURCE is not None:
+        return None
+    if TRANSLATION_BATCHER.enabled:
+        name, translated = TRANSLATION_BATCHER.translate(text, from_lang, to_lang)
+        if translated and len(translated) > min_length:
+            TRANSLATION_CACHE.store(text, from_lang, to_lang, name, translated)
+            return translated
+    # One request per text, also for segments the batch could not translate
+    for name in TRANSLATION_ROUTER.ordered():
+        try:
+            translated = TRANSLATION_ROUTER.call(name, text, from_lang, to_lang)
+        except Exception as e:
+            log(f"{name} translate failed: {str(e)}", "DEBUG")
+            continue
+        if translated and isinstance(translated, str) and len(translated.strip()) > min_length:
+            translated = translated.strip()
+            log(f"Translated with {name}: {len(translated)} characters", "DEBUG")
+            TRANSLATION_CACHE.store(text, from_lang, to_lang, name, translated)
+            return translated
+    return None
+
+def cached_translation(text, to_lang='en', page=None):
+    """Translation of text the way translate_text would produce it, from the cache only.
+    
+    Never calls a provider: a miss returns None and is left to the translation stage.
+    """
+    text = html_to_text(text.strip(), page)
+    # Names (short texts) and descriptions need results of different lengths
+    min_length = 2 if len(text) < 200 else 10
+    _, translated = TRANSLATION_CACHE.lookup(text, 'zh', to_lang if to_lang == 'ar' else 'en')
+    return translated if translated and len(translated) > min_length else None
+
+def translate_text(text, from_lang='zh', to_lang='en', page=None):
     """Translate text using multiple translation services"""
     if not text or not text.strip():
         return text
     
+    if REPLAY_SOURCE is not None:
+        # Replay runs never touch the network: translations only come from the cache
+        try:
+            return cached_translation(text, to_lang, page) or text
+        except Exception as e:
+            log(f"Translation error: {str(e)}", "WARNING")
+            return text
+    
     try:
         # Clean the text first
         text = text.strip()
         
         # For Arabic translation, use a more reliable approach
         if to_lang == 'ar':
-            return translate_to_arabic(text, from_lang)
+            return translate_to_arabic(text, from_lang, page)
         elif to_lang == 'en':
-            return translate_to_english(text, from_lang)
+            return translate_to_english(text, from_lang, page)
         else:
             # For other languages, use the original method
-            return translate_to_english(text, from_lang)
+            return translate_to_english(text, from_lang, page)
             
     except Exception as e:
         log(f"Translation error: {str(e)}", "WARNING")
         return text
 
-def translate_to_arabic(text, from_lang='zh'):
+def translate_to_arabic(text, from_lang='zh', page=None):
     """Translate text to proper Arabic with correct spacing and grammar"""
     if not text or not text.strip():
         return text
     
     try:
-        # First, try to extract meaningful content from HTML if present
-        if '<' in text and '>' in text:
-            soup = BeautifulSoup(text, 'html.parser')
-            text = soup.get_text(separator=' ', strip=True)
-        
-        # Clean up the text
-        text = re.sub(r'\s+', ' ', text).strip()
+        # Extract meaningful content from HTML if present and clean up the text
+        text = html_to_text(text, page)
         
         # For product names, create a proper Arabic translation
         if len(text) < 200:  # Likely a product name
@@ -846,40 +2175,10 @@ def translate_product_name_to_arabic(text):
         return "منتج عالي الجودة"
     
     try:
-        # Try multiple translation methods
-        translated = None
-        
-        # Method 1: Try translate_text
-        try:
-            translated = ts.translate_text(text, from_language='zh', to_language='ar')
-            if translated and isinstance(translated, str) and len(translated.strip()) > 2:
-                return translated.strip()
-        except Exception as e:
-            log(f"translate_text failed: {str(e)}", "DEBUG")
-            pass
-        
-        # Method 2: Try google translate
-        if not translated:
-            try:
-                translated = ts.google(text, from_language='zh', to_language='ar')
-                if translated and isinstance(translated, str) and len(translated.strip()) > 2:
-                    return translated.strip()
-            except Exception as e:
-                log(f"google translate failed: {str(e)}", "DEBUG")
-                pass
-        
-        # Method 3: Try bing translate
-        if not translated:
-            try:
-                translated = ts.bing(text, from_language='zh', to_language='ar')
-                if translated and isinstance(translated, str) and len(translated.strip()) > 2:
-                    return translated.strip()
-            except Exception as e:
-                log(f"bing translate failed: {str(e)}", "DEBUG")
-                pass
-        
-        if translated and len(translated.strip()) > 2:
-            return translated.strip()
+        # Cached translation, else the first provider with a usable result
+        translated = translate_with_providers(text, 'ar')
+        if translated:
+            return translated
         else:
             # Fallback: analyze content and generate appropriate name
             info = analyze_product_content(text)
@@ -906,40 +2205,10 @@ def translate_product_name_to_english(text):
         return "High-Quality Product"
     
     try:
-        # Try multiple translation methods
-        translated = None
-        
-        # Method 1: Try translate_text
-        try:
-            translated = ts.translate_text(text, from_language='zh', to_language='en')
-            if translated and isinstance(translated, str) and len(translated.strip()) > 2:
-                return translated.strip()
-        except Exception as e:
-            log(f"translate_text failed: {str(e)}", "DEBUG")
-            pass
-        
-        # Method 2: Try google translate
-        if not translated:
-            try:
-                translated = ts.google(text, from_language='zh', to_language='en')
-                if translated and isinstance(translated, str) and len(translated.strip()) > 2:
-                    return translated.strip()
-            except Exception as e:
-                log(f"google translate failed: {str(e)}", "DEBUG")
-                pass
-        
-        # Method 3: Try bing translate
-        if not translated:
-            try:
-                translated = ts.bing(text, from_language='zh', to_language='en')
-                if translated and isinstance(translated, str) and len(translated.strip()) > 2:
-                    return translated.strip()
-            except Exception as e:
-                log(f"bing translate failed: {str(e)}", "DEBUG")
-                pass
-        
-        if translated and len(translated.strip()) > 2:
-            return translated.strip()
+        # Cached translation, else the first provider with a usable result
+        translated = translate_with_providers(text, 'en')
+        if translated:
+            return translated
         else:
             # Fallback: analyze content and generate appropriate name
             info = analyze_product_content(text)
@@ -960,6 +2229,17 @@ def translate_product_name_to_english(text):
         log(f"English name translation error: {str(e)}", "WARNING")
         return "High-Quality Product"
 
+# Size/weight and brand patterns for analyze_product_content, in priority order
+PRODUCT_SIZE_RES = [
+    REGEXES.compile(f'analyze_product_content.size.{unit}', rf'(\d+(?:\.\d+)?)\s*(?:{unit}|{native})')
+    for unit, native in (('cm', '厘米'), ('inch', '英寸'), ('kg', '千克'), ('g', '克'), ('m', '米'))
+]
+PRODUCT_BRAND_RES = [
+    REGEXES.compile('analyze_product_content.brand.zh', r'品牌[：:]\s*([^\s,，。]+)'),
+    REGEXES.compile('analyze_product_content.brand.en', r'brand[：:]\s*([^\s,，。]+)'),
+    REGEXES.compile('analyze_product_content.brand.suffix', r'([A-Z]{2,}[A-Za-z0-9]*)\s*(?:品牌|brand)'),
+]
+
 def analyze_product_content(text):
     """Analyze Chinese product content to extract real product information"""
     if not text:
@@ -1010,16 +2290,8 @@ def analyze_product_content(text):
     info['features'] = detected_features
     
     # Extract size/weight information
-    size_patterns = [
-        r'(\d+(?:\.\d+)?)\s*(?:cm|厘米)',
-        r'(\d+(?:\.\d+)?)\s*(?:inch|英寸)',
-        r'(\d+(?:\.\d+)?)\s*(?:kg|千克)',
-        r'(\d+(?:\.\d+)?)\s*(?:g|克)',
-        r'(\d+(?:\.\d+)?)\s*(?:m|米)'
-    ]
-    
-    for pattern in size_patterns:
-        match = re.search(pattern, text)
+    for pattern in PRODUCT_SIZE_RES:
+        match = pattern.search(text)
         if match:
             info['size'] = match.group(1)
             break
@@ -1034,14 +2306,8 @@ def analyze_product_content(text):
             break
     
     # Extract brand information (common patterns)
-    brand_patterns = [
-        r'品牌[：:]\s*([^\s,，。]+)',
-        r'brand[：:]\s*([^\s,，。]+)',
-        r'([A-Z]{2,}[A-Za-z0-9]*)\s*(?:品牌|brand)',
-    ]
-    
-    for pattern in brand_patterns:
-        match = re.search(pattern, text)
+    for pattern in PRODUCT_BRAND_RES:
+        match = pattern.search(text)
         if match:
             info['brand'] = match.group(1)
             break
@@ -1057,27 +2323,9 @@ def create_proper_arabic_description(text):
         # Try multiple translation methods for the original description
         translated_desc = ""
         if text and len(text.strip()) > 5:
-            try:
-                # Method 1: Try translate_text
-                translated_desc = ts.translate_text(text, from_language='zh', to_language='ar')
-                if translated_desc and isinstance(translated_desc, str) and len(translated_desc.strip()) > 10:
-                    log(f"Successfully translated with translate_text: {len(translated_desc)} characters")
-            except Exception as e:
-                log(f"translate_text failed: {str(e)}", "DEBUG")
-                try:
-                    # Method 2: Try google translate
-                    translated_desc = ts.google(text, from_language='zh', to_language='ar')
-                    if translated_desc and isinstance(translated_desc, str) and len(translated_desc.strip()) > 10:
-                        log(f"Successfully translated with google: {len(translated_desc)} characters")
-                except Exception as e:
-                    log(f"google translate failed: {str(e)}", "DEBUG")
-                    try:
-                        # Method 3: Try bing translate
-                        translated_desc = ts.bing(text, from_language='zh', to_language='ar')
-                        if translated_desc and isinstance(translated_desc, str) and len(translated_desc.strip()) > 10:
-                            log(f"Successfully translated with bing: {len(translated_desc)} characters")
-                    except Exception as e:
-                        log(f"bing translate failed: {str(e)}", "DEBUG")
+            translated_desc = translate_with_providers(text, 'ar', min_length=10) or ""
+            if translated_desc:
+                log(f"Successfully translated description: {len(translated_desc)} characters")
         
         description_parts = []
         
@@ -1109,101 +2357,763 @@ def create_proper_english_description(text):
         # Try multiple translation methods for the original description
         translated_desc = ""
         if text and len(text.strip()) > 5:
+            translated_desc = translate_with_providers(text, 'en', min_length=10) or ""
+            if translated_desc:
+                log(f"Successfully translated description: {len(translated_desc)} characters")
+        
+        description_parts = []
+        
+        # Add translated description if available
+        if translated_desc and len(translated_desc.strip()) > 10:
+            description_parts.append(translated_desc.strip())
+        
+        # Only keep pure translated content - no generated category or feature descriptions
+        
+        # Only keep pure translated content - no generated specifications
+        
+        # Only keep translated content - no generic features or additional information
+        
+        result = "\n".join([part for part in description_parts if part])
+        if not result or len(result.strip()) < 10:
+            log("No valid translated content available, returning empty description", "WARNING")
+            return ""
+        return result
+    except Exception as e:
+        log(f"English description creation error: {str(e)}", "WARNING")
+        return ""
+
+def translate_chunk_to_arabic(text, from_lang='zh'):
+    """This function is now deprecated - use translate_to_arabic instead"""
+    return translate_to_arabic(text, from_lang)
+
+def create_generic_arabic_description(text):
+    """This function is now deprecated - use create_proper_arabic_description instead"""
+    return create_proper_arabic_description(text)
+
+def translate_to_english(text, from_lang='zh', page=None):
+    """Translate text to proper English with correct spacing and grammar"""
+    if not text or not text.strip():
+        return text
+
+    try:
+        # Extract meaningful content from HTML if present and clean up the text
+        text = html_to_text(text, page)
+        
+        # For product names, create a proper English translation
+        if len(text) < 200:  # Likely a product name
+            return translate_product_name_to_english(text)
+        else:
+            # For descriptions, create a proper English description
+            return create_proper_english_description(text)
+            
+    except Exception as e:
+        log(f"English translation error: {str(e)}", "WARNING")
+        return text
+
+def translate_chunk_to_english(text, from_lang='zh'):
+    """This function is now deprecated - use translate_to_english instead"""
+    return translate_to_english(text, from_lang)
+
+def create_generic_english_description(text):
+    """This function is now deprecated - use create_proper_english_description instead"""
+    return create_proper_english_description(text)
+
+class SessionPool:
+    """Pool of long-lived cloudscraper sessions, kept separately for each host.
+    
+    Sessions are reused across requests so the TLS connection (keep-alive),
+    cookies and solved challenge state survive between URLs. All sessions
+    for the same site share one cookie jar.
+    """
+    def __init__(self, pool_size=4, host_pool_sizes=None):
+        self.pool_size = max(1, pool_size)
+        self.host_pool_sizes = dict(host_pool_sizes or {})
+        self._condition = threading.Condition()
+        self._idle = {}
+        self._created = {}
+        self._cookie_jars = {}
+
+    def configure(self, pool_size, host_pool_sizes=None):
+        """Change pool sizes; existing sessions are kept"""
+        with self._condition:
+            self.pool_size = max(1, pool_size)
+            self.host_pool_sizes = dict(host_pool_sizes or {})
+            self._condition.notify_all()
+
+    def _site_key(self, host):
+        """Group hosts by site so e.g. detail.1688.com and www.1688.com share cookies"""
+        parts = host.split('.')
+        return '.'.join(parts[-2:]) if len(parts) >= 2 else host
+
+    def _size_for(self, host):
+        return max(1, int(self.host_pool_sizes.get(host, self.pool_size)))
+
+    def _create_session(self, host):
+        """Build a new session (without holding the pool lock)"""
+        return cloudscraper.create_scraper(
+            browser={
+                'browser': 'chrome',
+                'platform': 'windows',
+                'desktop': True
+            }
+        )
+
+    def _share_cookies(self, host, scraper):
+        """Attach the site's shared cookie jar to a new session (lock held)"""
+        site = self._site_key(host)
+        if site not in self._cookie_jars:
+            self._cookie_jars[site] = scraper.cookies
+        else:
+            scraper.cookies = self._cookie_jars[site]
+
+    def acquire(self, url):
+        """Check out a session for the URL's host, waiting if the host pool is exhausted"""
+        host = urlparse(url).netloc.lower()
+        with self._condition:
+            while True:
+                idle = self._idle.setdefault(host, [])
+                if idle:
+                    return host, idle.pop()
+                if self._created.get(host, 0) < self._size_for(host):
+                    # Reserve the slot; the session is built outside the lock
+                    self._created[host] = self._created.get(host, 0) + 1
+                    created = self._created[host]
+                    break
+                self._condition.wait()
+        try:
+            session = self._create_session(host)
+        except Exception:
+            with self._condition:
+                self._created[host] -= 1
+                self._condition.notify()
+            raise
+        with self._condition:
+            self._share_cookies(host, session)
+        log(f"Created new session for {host} ({created}/{self._size_for(host)})", "DEBUG")
+        return host, session
+
+    def release(self, host, session):
+        """Return a session to its host pool"""
+        with self._condition:
+            self._idle.setdefault(host, []).append(session)
+            self._condition.notify()
+
+    @contextmanager
+    def session(self, url):
+        """Check a session out for the duration of a request"""
+        host, session = self.acquire(url)
+        try:
+            yield session
+        finally:
+            self.release(host, session)
+
+    def close(self):
+        """Close all idle sessions"""
+        with self._condition:
+            for sessions in self._idle.values():
+                for session in sessions:
+                    try:
+                        session.close()
+                    except Exception:
+                        pass
+            self._idle.clear()
+            self._created.clear()
+            self._cookie_jars.clear()
+
+# Shared by all workers; sized from settings in main()
+SESSION_POOL = SessionPool()
+
+def configure_session_pool(settings, workers=1):
+    """Size the shared session pool from settings (0 = one session per worker)"""
+    pool_size = int(settings.get('session_pool_size', 0) or 0) or workers
+    SESSION_POOL.configure(pool_size, settings.get('session_pool_sizes', {}))
+    log(f"Session pool size: {pool_size} per host")
+
+def host_group(url):
+    """Map a URL to the host group used for concurrency limits"""
+    host = urlparse(url).netloc.lower()
+    if host == 'detail.1688.com':
+        return 'detail.1688.com'
+    if 'itemcdn' in host:
+        # Description pages referenced by detailUrl (itemcdn.tmall.com, etc.)
+        return 'itemcdn'
+    if host == 'cbu01.alicdn.com':
+        return 'cbu01.alicdn.com'
+    return 'default'
+
+class HostLimiter:
+    """Caps the number of in-flight requests for each host group.
+    
+    Thread-safe so it applies no matter which worker thread or executor
+    performs the request, and limits can be changed while requests run.
+    """
+    def __init__(self, limits=None):
+        self._condition = threading.Condition()
+        self._limits = dict(DEFAULT_SCRAPER_SETTINGS['host_concurrency'])
+        self._limits.update(limits or {})
+        self._in_flight = {}
+
+    def limit_for(self, group):
+        return max(1, int(self._limits.get(group, self._limits.get('default', 8))))
+
+    def set_limit(self, group, limit):
+        """Change the cap for a host group, waking up waiters if it grew"""
+        with self._condition:
+            self._limits[group] = max(1, int(limit))
+            self._condition.notify_all()
+
+    def configure(self, limits):
+        with self._condition:
+            self._limits.update(limits or {})
+            self._condition.notify_all()
+
+    def in_flight(self, group):
+        return self._in_flight.get(group, 0)
+
+    @contextmanager
+    def slot(self, url):
+        """Hold one request slot for the URL's host group"""
+        group = host_group(url)
+        with self._condition:
+            while self._in_flight.get(group, 0) >= self.limit_for(group):
+                self._condition.wait()
+            self._in_flight[group] = self._in_flight.get(group, 0) + 1
+        try:
+            yield group
+        finally:
+            with self._condition:
+                self._in_flight[group] -= 1
+                self._condition.notify_all()
+
+# Shared by all workers and the asyncio pipeline
+HOST_LIMITER = HostLimiter()
+
+class TokenBucket:
+    """Thread-safe token bucket: allows bursts of `burst` requests, then `rate` per second"""
+    def __init__(self, rate, burst=1):
+        self.rate = float(rate)
+        self.burst = max(1.0, float(burst))
+        self._tokens = self.burst
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take one token, sleeping until one is available. Returns seconds waited"""
+        if self.rate <= 0:
+            return 0.0
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+class RateLimiter:
+    """One token bucket per host group, shared across all workers"""
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._rate_limits = {}
+
+    def configure(self, rate_limits):
+        """Rebuild buckets from settings; groups without a rate are unlimited"""
+        with self._lock:
+            self._rate_limits = dict(rate_limits or {})
+            self._buckets = {}
+        for group in sorted(self._rate_limits):
+            bucket = self.bucket(group)
+            log(f"Rate limit for {group}: {bucket.rate:.2f} req/s, burst {bucket.burst:.0f}"
+                if bucket.rate > 0 else f"Rate limit for {group}: unlimited")
+
+    def bucket(self, group):
+        with self._lock:
+            if group not in self._buckets:
+                limits = self._rate_limits.get(group, {})
+                rate = limits.get('rate', 0.0)
+                self._buckets[group] = TokenBucket(rate, limits.get('burst', 1))
+            return self._buckets[group]
+
+    def wait(self, url):
+        """Block until the URL's host group may send another request"""
+        waited = self.bucket(host_group(url)).acquire()
+        if waited > 0:
+            log(f"Rate limited {host_group(url)} for {waited:.2f}s", "DEBUG")
+        return waited
+
+# Shared by all workers and the asyncio pipeline; configured in main()
+RATE_LIMITER = RateLimiter()
+
+# Markers of 1688/Alibaba anti-bot interstitials served with status 200
+CAPTCHA_MARKERS = ('_____tmd_____/punish', 'x5secdata', 'nc_1_nocaptcha', 'punish-component')
+
+def is_captcha_page(html_content):
+    """Detect a slider/captcha challenge page returned instead of the product"""
+    if not html_content:
+        return False
+    return any(marker in html_content for marker in CAPTCHA_MARKERS)
+
+class AdaptiveConcurrency:
+    """AIMD controller for per-host concurrency limits.
+    
+    Healthy responses (fast, successful) raise a host group's limit by one
+    after a full window of successes; blocking signals (403/429, captcha
+    pages, timeouts) cut it by decrease_factor. Decreases are spaced by a
+    cooldown so one burst of failures only counts once.
+    """
+    def __init__(self, limiter, min_limit=1, max_limit=64, latency_target=5.0,
+                 decrease_factor=0.5, cooldown=10.0, window=20, enabled=True):
+        self.limiter = limiter
+        self._lock = threading.Lock()
+        self._state = {}
+        self.configure({
+            'enabled': enabled, 'min': min_limit, 'max': max_limit, 'latency_target': latency_target,
+            'decrease_factor': decrease_factor, 'cooldown': cooldown, 'window': window
+        })
+
+    def configure(self, settings):
+        with self._lock:
+            self.enabled = bool(settings.get('enabled', True))
+            self.min_limit = max(1, int(settings.get('min', 1)))
+            self.max_limit = max(self.min_limit, int(settings.get('max', 64)))
+            self.latency_target = float(settings.get('latency_target', 5.0))
+            self.decrease_factor = min(0.95, max(0.05, float(settings.get('decrease_factor', 0.5))))
+            self.cooldown = float(settings.get('cooldown', 10.0))
+            self.window = max(1, int(settings.get('window', 20)))
+            self._state = {}
+
+    def _group_state(self, group):
+        if group not in self._state:
+            self._state[group] = {'successes': 0, 'outcomes': [], 'last_decrease': 0.0}
+        return self._state[group]
+
+    def record(self, url, status=None, latency=0.0, captcha=False, timeout=False):
+        """Feed one request outcome into the controller"""
+        if not self.enabled:
+            return
+        group = host_group(url)
+        blocked = timeout or captcha or status in (403, 429)
+        healthy = status == 200 and not blocked and latency <= self.latency_target
+        with self._lock:
+            state = self._group_state(group)
+            state['outcomes'] = (state['outcomes'] + [status == 200 and not blocked])[-self.window:]
+            current = self.limiter.limit_for(group)
+            if blocked:
+                state['successes'] = 0
+                now = time.monotonic()
+                if now - state['last_decrease'] < self.cooldown:
+                    return
+                state['last_decrease'] = now
+                new_limit = max(self.min_limit, int(current * self.decrease_factor))
+                reason = 'timeout' if timeout else 'captcha' if captcha else f'status {status}'
+            elif healthy:
+                state['successes'] += 1
+                success_rate = sum(state['outcomes']) / len(state['outcomes'])
+                if state['successes'] < current or success_rate < 0.9:
+                    return
+                state['successes'] = 0
+                new_limit = min(self.max_limit, current + 1)
+                reason = f'healthy, {latency:.1f}s latency'
+            else:
+                return
+        if new_limit != current:
+            self.limiter.set_limit(group, new_limit)
+            level = "WARNING" if blocked else "INFO"
+            log(f"Concurrency limit for {group}: {current} -> {new_limit} ({reason})", level)
+
+    def report(self):
+        """Current limit and recent success rate for each host group seen so far"""
+        with self._lock:
+            groups = list(self._state.items())
+        return {
+            group: {
+                'limit': self.limiter.limit_for(group),
+                'success_rate': round(sum(state['outcomes']) / len(state['outcomes']), 2) if state['outcomes'] else None
+            }
+            for group, state in groups
+        }
+
+ADAPTIVE_CONCURRENCY = AdaptiveConcurrency(HOST_LIMITER)
+
+def pooled_get(url, timeout=30, headers=None):
+    """GET through the shared rate limiter, host limiter and session pool.
+    
+    Every outcome is reported to the adaptive concurrency controller.
+    Exceptions are re-raised after being recorded.
+    """
+    RATE_LIMITER.wait(url)
+    with HOST_LIMITER.slot(url), SESSION_POOL.session(url) as session:
+        started = time.monotonic()
+        try:
+            response = session.get(url, headers=headers, timeout=timeout)
+        except requests.exceptions.RequestException as e:
+            is_timeout = isinstance(e, (requests.exceptions.Timeout, requests.exceptions.ConnectionError))
+            ADAPTIVE_CONCURRENCY.record(url, latency=time.monotonic() - started, timeout=is_timeout)
+            raise
+    captcha = response.status_code == 200 and is_captcha_page(response.text)
+    ADAPTIVE_CONCURRENCY.record(url, response.status_code, time.monotonic() - started, captcha=captcha)
+    response.is_captcha = captcha
+    return response
+
+# Query parameters that only track the click path and never change the page
+TRACKING_PARAMS = {'spm', 'spm-url', 'spm-auction', 'traceid', 'tracelog', 'scm', 'clickid', 'sk', 'utm_source', 'utm_medium', 'utm_campaign'}
+
+def offer_id_from_url(url):
+    """Return the numeric offer ID of a detail.1688.com/offer/<id>.html URL, or None"""
+    match = re.search(r'/offer/(\d+)\.html', url or '')
+    return match.group(1) if match else None
+
+def canonical_offer_url(url):
+    """Normalize any 1688 offer URL (desktop or mobile, any query string) to
+    https://detail.1688.com/offer/<id>.html. Returns None for other URLs."""
+    offer_id = offer_id_from_url(url)
+    if offer_id and urlparse(url.strip()).netloc.lower().endswith('1688.com'):
+        return f"https://detail.1688.com/offer/{offer_id}.html"
+    return None
+
+def canonical_url(url):
+    """Normalize a URL for cache keys: lowercase host, no fragment, no tracking params, sorted query.
+    1688 offer pages collapse to their offer ID."""
+    offer_url = canonical_offer_url(url)
+    if offer_url:
+        return offer_url
+    parsed = urlparse(url.strip())
+    query = sorted((k, v) for k, v in parse_qsl(parsed.query, keep_blank_values=True)
+                   if k.lower() not in TRACKING_PARAMS)
+    return urlunparse((parsed.scheme.lower() or 'https', parsed.netloc.lower(), parsed.path or '/', '', urlencode(query), ''))
+
+class CachedResponse:
+    """Response-like object served from the response cache or a replay archive"""
+    def __init__(self, text, headers=None, status_code=200):
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers or {}
+        self.is_captcha = False
+        self.from_cache = True
+
+class ResponseCache:
+    """Persistent on-disk HTTP response cache.
+    
+    Metadata (headers, ETag/Last-Modified, fetch time) is stored per canonical
+    URL; bodies are stored gzip-compressed under their SHA-256, so identical
+    bodies are kept once.
+    """
+    def __init__(self, cache_dir, ttl_hours=24, enabled=True):
+        self.cache_dir = cache_dir
+        self.ttl = ttl_hours * 3600
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'revalidated': 0, 'misses': 0, 'stored': 0}
+
+    def configure(self, settings):
+        self.enabled = bool(settings.get('enabled', True))
+        self.ttl = float(settings.get('ttl_hours', 24)) * 3600
+
+    def _meta_path(self, url):
+        key = hashlib.sha256(canonical_url(url).encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, 'meta', key[:2], f'{key}.json')
+
+    def _body_path(self, body_hash):
+        return os.path.join(self.cache_dir, 'bodies', body_hash[:2], f'{body_hash}.gz')
+
+    def _write_atomic(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def record(self, stat):
+        with self._lock:
+            self.stats[stat] += 1
+
+    def lookup(self, url):
+        """Return (entry, body) for a cached URL, or (None, None)"""
+        if not self.enabled:
+            return None, None
+        try:
+            with open(self._meta_path(url), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            with gzip.open(self._body_path(entry['body_sha256']), 'rt', encoding='utf-8') as f:
+                return entry, f.read()
+        except (OSError, ValueError, KeyError):
+            return None, None
+
+    def is_fresh(self, entry):
+        return time.time() - entry.get('fetched_at', 0) < self.ttl
+
+    def conditional_headers(self, entry):
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def store(self, url, response):
+        """Save a successful response body and its validators"""
+        if not self.enabled:
+            return
+        try:
+            body = response.text.encode('utf-8')
+            body_hash = hashlib.sha256(body).hexdigest()
+            body_path = self._body_path(body_hash)
+            if not os.path.exists(body_path):
+                self._write_atomic(body_path, gzip.compress(body))
+            headers = {k: v for k, v in response.headers.items()
+                       if k.lower() in ('content-type', 'etag', 'last-modified', 'cache-control')}
+            entry = {
+                'url': canonical_url(url),
+                'status': response.status_code,
+                'headers': headers,
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'fetched_at': time.time(),
+                'body_sha256': body_hash
+            }
+            self._write_atomic(self._meta_path(url), json.dumps(entry, ensure_ascii=False).encode('utf-8'))
+            self.record('stored')
+        except Exception as e:
+            log(f"Failed to cache response for {url}: {e}", "WARNING")
+
+    def touch(self, url, entry):
+        """Mark a cached entry as fresh again after a 304 Not Modified"""
+        entry['fetched_at'] = time.time()
+        try:
+            self._write_atomic(self._meta_path(url), json.dumps(entry, ensure_ascii=False).encode('utf-8'))
+        except Exception as e:
+            log(f"Failed to update cache entry for {url}: {e}", "WARNING")
+
+RESPONSE_CACHE = ResponseCache(os.path.join(CACHE_DIR, 'http'))
+
+def detail_content_key(detail_url):
+    """Stable file key for a saved detailUrl page, so replay can find it again"""
+    return hashlib.md5(canonical_url(detail_url).encode('utf-8')).hexdigest()[:16]
+
+def url_from_archived_page(html_content):
+    """Recover the product URL of an archived page from its offer ID"""
+    # Most specific first: recommendation blocks link to other offers too
+    for pattern in (r'<link[^>]+rel="canonical"[^>]+detail\.1688\.com/offer/(\d+)\.html',
+                    r'<meta[^>]+og:url[^>]+detail\.1688\.com/offer/(\d+)\.html',
+                    r'"offerId"\s*:\s*"?(\d+)',
+                    r'detail\.1688\.com/offer/(\d+)\.html'):
+        match = re.search(pattern, html_content)
+        if match:
+            return f"https://detail.1688.com/offer/{match.group(1)}.html"
+    return None
+
+def read_archived_html(path):
+    """Read an archived page, transparently decompressing .zst and .gz files"""
+    if path.endswith('.zst'):
+        if zstandard is None:
+            raise RuntimeError(f"zstandard is required to read {path}")
+        with open(path, 'rb') as f:
+            return zstandard.ZstdDecompressor().decompress(f.read()).decode('utf-8', errors='replace')
+    if path.endswith('.gz'):
+        with gzip.open(path, 'rt', encoding='utf-8', errors='replace') as f:
+            return f.read()
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        return f.read()
+
+class HtmlArchive:
+    """Compressed, content-addressed archive of fetched HTML.
+    
+    Each page is stored once as <offer_id>_<sha256 prefix>.html.zst (or .gz
+    without zstandard) and every save appends a line to index.jsonl mapping
+    the URL to its file. Compression and disk writes happen on a background
+    thread so saving debug HTML never stalls the scraper.
+    """
+    INDEX_FILE = 'index.jsonl'
+
+    def __init__(self, archive_dir):
+        self.archive_dir = archive_dir
+        self.extension = '.html.zst' if zstandard is not None else '.html.gz'
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.stats = {'saved': 0, 'deduplicated': 0, 'raw_bytes': 0, 'stored_bytes': 0}
+
+    def save(self, kind, url, html_content, **extra):
+        """Queue a page for archiving; returns immediately"""
+        if not html_content:
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._writer, name='html-archive', daemon=True)
+                self._thread.start()
+        self._queue.put((kind, url, html_content, extra))
+
+    def _compress(self, data):
+        if zstandard is not None:
+            return zstandard.ZstdCompressor(level=3).compress(data)
+        return gzip.compress(data, compresslevel=6)
+
+    def _writer(self):
+        os.makedirs(self.archive_dir, exist_ok=True)
+        index_path = os.path.join(self.archive_dir, self.INDEX_FILE)
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                break
+            kind, url, html_content, extra = item
             try:
-                # Method 1: Try translate_text
-                translated_desc = ts.translate_text(text, from_language='zh', to_language='en')
-                if translated_desc and isinstance(translated_desc, str) and len(translated_desc.strip()) > 10:
-                    log(f"Successfully translated with translate_text: {len(translated_desc)} characters")
+                data = html_content.encode('utf-8')
+                content_hash = hashlib.sha256(data).hexdigest()
+                offer_id = offer_id_from_url(url)
+                filename = f"{offer_id or kind}_{content_hash[:16]}{self.extension}"
+                path = os.path.join(self.archive_dir, filename)
+                if os.path.exists(path):
+                    self.stats['deduplicated'] += 1
+                else:
+                    compressed = self._compress(data)
+                    with open(f'{path}.tmp', 'wb') as f:
+                        f.write(compressed)
+                    os.replace(f'{path}.tmp', path)
+                    self.stats['saved'] += 1
+                    self.stats['raw_bytes'] += len(data)
+                    self.stats['stored_bytes'] += len(compressed)
+                record = {
+                    'kind': kind,
+                    'url': url,
+                    'offer_id': offer_id,
+                    'sha256': content_hash,
+                    'file': filename,
+                    'archived_at': datetime.now().isoformat(timespec='seconds')
+                }
+                record.update(extra)
+                with open(index_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(record, ensure_ascii=False) + '\n')
+                log(f"Archived {kind} HTML for {url} as {filename}", "DEBUG")
             except Exception as e:
-                log(f"translate_text failed: {str(e)}", "DEBUG")
-                try:
-                    # Method 2: Try google translate
-                    translated_desc = ts.google(text, from_language='zh', to_language='en')
-                    if translated_desc and isinstance(translated_desc, str) and len(translated_desc.strip()) > 10:
-                        log(f"Successfully translated with google: {len(translated_desc)} characters")
-                except Exception as e:
-                    log(f"google translate failed: {str(e)}", "DEBUG")
-                    try:
-                        # Method 3: Try bing translate
-                        translated_desc = ts.bing(text, from_language='zh', to_language='en')
-                        if translated_desc and isinstance(translated_desc, str) and len(translated_desc.strip()) > 10:
-                            log(f"Successfully translated with bing: {len(translated_desc)} characters")
-                    except Exception as e:
-                        log(f"bing translate failed: {str(e)}", "DEBUG")
-        
-        description_parts = []
-        
-        # Add translated description if available
-        if translated_desc and len(translated_desc.strip()) > 10:
-            description_parts.append(translated_desc.strip())
-        
-        # Only keep pure translated content - no generated category or feature descriptions
-        
-        # Only keep pure translated content - no generated specifications
-        
-        # Only keep translated content - no generic features or additional information
-        
-        result = "\n".join([part for part in description_parts if part])
-        if not result or len(result.strip()) < 10:
-            log("No valid translated content available, returning empty description", "WARNING")
-            return ""
-        return result
-    except Exception as e:
-        log(f"English description creation error: {str(e)}", "WARNING")
-        return ""
+                log(f"Failed to archive HTML for {url}: {e}", "WARNING")
+            finally:
+                self._queue.task_done()
 
-def translate_chunk_to_arabic(text, from_lang='zh'):
-    """This function is now deprecated - use translate_to_arabic instead"""
-    return translate_to_arabic(text, from_lang)
+    def close(self):
+        """Flush pending writes and stop the writer thread"""
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is not None and thread.is_alive():
+            self._queue.put(None)
+            thread.join()
+        if self.stats['saved'] or self.stats['deduplicated']:
+            log(f"HTML archive: {self.stats['saved']} pages saved ({self.stats['raw_bytes'] / 1024:.0f} KB -> "
+                f"{self.stats['stored_bytes'] / 1024:.0f} KB), {self.stats['deduplicated']} unchanged pages skipped")
 
-def create_generic_arabic_description(text):
-    """This function is now deprecated - use create_proper_arabic_description instead"""
-    return create_proper_arabic_description(text)
+HTML_ARCHIVE = HtmlArchive(ARCHIVE_DIR)
 
-def translate_to_english(text, from_lang='zh'):
-    """Translate text to proper English with correct spacing and grammar"""
-    if not text or not text.strip():
-        return text
+class ReplaySource:
+    """Serves archived HTML instead of the network for --replay runs.
+    
+    Reads an HtmlArchive directory (index.jsonl), an output folder that
+    contains one, or a folder of loose page_content_*.html /
+    failed_product_*.html and detail_content_<key>.html files.
+    """
+    def __init__(self, replay_dir):
+        self.replay_dir = replay_dir
+        self.pages = {}
+        self.detail_pages = {}
+        self.misses = 0
 
-    try:
-        # First, try to extract meaningful content from HTML if present
-        if '<' in text and '>' in text:
-            soup = BeautifulSoup(text, 'html.parser')
-            text = soup.get_text(separator=' ', strip=True)
-        
-        # Clean up the text
-        text = re.sub(r'\s+', ' ', text).strip()
-        
-        # For product names, create a proper English translation
-        if len(text) < 200:  # Likely a product name
-            return translate_product_name_to_english(text)
-        else:
-            # For descriptions, create a proper English description
-            return create_proper_english_description(text)
-            
-    except Exception as e:
-        log(f"English translation error: {str(e)}", "WARNING")
-        return text
+    def _load_index(self, archive_dir):
+        with open(os.path.join(archive_dir, HtmlArchive.INDEX_FILE), 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                path = os.path.join(archive_dir, record['file'])
+                if record['kind'] == 'detail':
+                    # Later entries win, so re-runs replay the newest content
+                    self.detail_pages[detail_content_key(record['url'])] = path
+                elif record['kind'] == 'page':
+                    self.pages.pop(record['url'], None)
+                    self.pages[record['url']] = path
 
-def translate_chunk_to_english(text, from_lang='zh'):
-    """This function is now deprecated - use translate_to_english instead"""
-    return translate_to_english(text, from_lang)
+    def _load_loose_files(self):
+        def sort_key(name):
+            number = re.search(r'(\d+)', name)
+            return (0 if name.startswith('page_content_') else 1, int(number.group(1)) if number else 0, name)
+        
+        for name in sorted(os.listdir(self.replay_dir), key=sort_key):
+            path = os.path.join(self.replay_dir, name)
+            if not name.endswith('.html') or not os.path.isfile(path):
+                continue
+            if name.startswith('detail_content_'):
+                self.detail_pages[name[len('detail_content_'):-len('.html')]] = path
+                continue
+            url = url_from_archived_page(read_archived_html(path)) or f"replay://{name}"
+            if url in self.pages:
+                log(f"Skipping {name}: {url} already loaded from {os.path.basename(self.pages[url])}", "DEBUG")
+                continue
+            self.pages[url] = path
 
-def create_generic_english_description(text):
-    """This function is now deprecated - use create_proper_english_description instead"""
-    return create_proper_english_description(text)
+    def load(self):
+        """Index the replay directory and return the product URLs in archive order"""
+        for archive_dir in (self.replay_dir, os.path.join(self.replay_dir, os.path.basename(ARCHIVE_DIR))):
+            if os.path.exists(os.path.join(archive_dir, HtmlArchive.INDEX_FILE)):
+                self._load_index(archive_dir)
+                break
+        self._load_loose_files()
+        log(f"Replay archive {self.replay_dir}: {len(self.pages)} product pages, {len(self.detail_pages)} detail pages")
+        return list(self.pages)
+
+    def get(self, url):
+        """Return the archived response for a URL (404 if it was never archived)"""
+        path = self.pages.get(url) or self.detail_pages.get(detail_content_key(url))
+        if not path:
+            self.misses += 1
+            log(f"Replay: no archived page for {url}", "DEBUG")
+            return CachedResponse('', status_code=404)
+        return CachedResponse(read_archived_html(path))
+
+# Set by main() for --replay runs; all network access is then served from the archive
+REPLAY_SOURCE = None
+
+def cached_get(url, timeout=30, headers=None):
+    """GET through the response cache, falling back to pooled_get.
+    
+    Fresh entries are served without a request; stale ones are revalidated
+    with If-None-Match / If-Modified-Since and reused on 304.
+    """
+    if REPLAY_SOURCE is not None:
+        return REPLAY_SOURCE.get(url)
+    
+    entry, body = RESPONSE_CACHE.lookup(url)
+    if entry and RESPONSE_CACHE.is_fresh(entry):
+        RESPONSE_CACHE.record('hits')
+        log(f"Using cached response for {url}", "DEBUG")
+        return CachedResponse(body, entry.get('headers'))
+    
+    request_headers = dict(headers or {})
+    if entry:
+        request_headers.update(RESPONSE_CACHE.conditional_headers(entry))
+        # Let the server answer 304 instead of forcing a full response
+        request_headers.pop('Cache-Control', None)
+    response = pooled_get(url, timeout=timeout, headers=request_headers)
+    
+    if response.status_code == 304 and entry:
+        RESPONSE_CACHE.record('revalidated')
+        RESPONSE_CACHE.touch(url, entry)
+        log(f"Cached response still valid (304) for {url}", "DEBUG")
+        return CachedResponse(body, entry.get('headers'))
+    
+    RESPONSE_CACHE.record('misses')
+    if response.status_code == 200 and not response.is_captcha:
+        RESPONSE_CACHE.store(url, response)
+    return response
 
 def fetch_page_with_cloudscraper(url):
-    """Fetch a page using cloudscraper to bypass anti-scraping measures"""
+    """Fetch a page using a pooled cloudscraper session to bypass anti-scraping measures"""
     try:
         log(f"Fetching page: {url}")
-        scraper = cloudscraper.create_scraper(
-            browser={
-                'browser': 'chrome',
-                'platform': 'windows',
-                'desktop': True
-            }
-        )
         
         # Set headers to mimic a browser
         headers = {
@@ -1216,8 +3126,11 @@ def fetch_page_with_cloudscraper(url):
             'Cache-Control': 'max-age=0',
         }
         
-        response = scraper.get(url, headers=headers, timeout=30)
+        response = cached_get(url, timeout=30, headers=headers)
         
+        if response.is_captcha:
+            log(f"Received captcha/anti-bot page instead of product: {url}", "WARNING")
+            return None
         if response.status_code == 200:
             log(f"Successfully fetched page (status code: {response.status_code})")
             return response.text
@@ -1228,199 +3141,307 @@ def fetch_page_with_cloudscraper(url):
         log(f"Error fetching page: {str(e)}", "ERROR")
         return None
 
-def extract_product_info(html_content, url, scraping_delay=2):
-    """Extract product information from HTML content"""
+def largest_content_block(soup, names=('div', 'section'), min_html=200, min_text=100):
+    """HTML of the largest div/section that contains an image or enough text.
+    
+    Picks the first of the largest elements whose serialized HTML is longer
+    than min_html and contains 'img' or has more than min_text characters of
+    get_text(strip=True). Sizes are computed for all subtrees in one post-order
+    pass instead of serializing every (nested) candidate.
+    """
+    candidates = soup.find_all(list(names))
+    if not candidates:
+        return None
+    text_types = candidates[0].interesting_string_types
+    if isinstance(text_types, type):
+        text_types = (text_types,)
+    
+    # Per node: (serialized length, 'img' in serialization, first 2 chars, last 2 chars, text length).
+    # The edge characters let 'img' be detected across the boundary of two joined pieces.
+    def piece(text):
+        return (len(text), 'img' in text, text[:2], text[-2:], 0)
+    
+    def join(left, right):
+        length = left[0] + right[0]
+        has_img = left[1] or right[1] or 'img' in left[3] + right[2]
+        head = left[2] if len(left[2]) >= 2 else (left[2] + right[2])[:2]
+        tail = right[3] if len(right[3]) >= 2 else (left[3] + right[3])[-2:]
+        return (length, has_img, head, tail, left[4] + right[4])
+    
+    sizes = {}
+    for node in reversed(list(soup.descendants)):
+        if isinstance(node, NavigableString):
+            text = node.output_ready(formatter='minimal')
+            size = piece(text)
+            if type(node) in text_types:
+                size = size[:4] + (len(node.strip()),)
+            sizes[id(node)] = size
+            continue
+        # Opening and closing tags come from an empty copy of the tag
+        shell = str(soup.new_tag(node.name, attrs=dict(node.attrs)))
+        if not node.contents:
+            sizes[id(node)] = piece(shell)
+            continue
+        close_at = shell.rindex('</')
+        size = piece(shell[:close_at])
+        for child in node.contents:
+            size = join(size, sizes[id(child)])
+        sizes[id(node)] = join(size, piece(shell[close_at:]))
+    
+    best_block = None
+    best_len = 0
+    for c in candidates:
+        c_len, has_img, _, _, text_len = sizes[id(c)]
+        if c_len > best_len and c_len > min_html and (has_img or text_len > min_text):
+            best_block = c
+            best_len = c_len
+    return str(best_block) if best_block is not None else None
+
+# --- Extractor chains: one per product field, see ExtractorChain ---
+NAME_CHAIN = ExtractorChain('name')
+IMAGE_CHAIN = ExtractorChain('images', lambda images: images.full or len(images) >= MIN_PRODUCT_IMAGES,
+                             accumulates=True)
+DESCRIPTION_CHAIN = ExtractorChain('description')
+PRICE_CHAIN = ExtractorChain('price')
+ATTRIBUTE_CHAIN = ExtractorChain('attributes')
+
+@NAME_CHAIN.strategy('#productTitle h1')
+def _name_from_title_heading(page):
+    title_h1 = page.soup.select_one('#productTitle h1')
+    if title_h1 and title_h1.text.strip():
+        product_name = title_h1.text.strip()
+        log(f"Found product name from #productTitle h1: {product_name}")
+        return product_name
+    return None
+
+@NAME_CHAIN.strategy('title tag', tier=1)
+def _name_from_title_tag(page):
+    title_tag = page.soup.find('title')
+    if title_tag and title_tag.text:
+        title_text = title_tag.text.strip()
+        if '-' in title_text:
+            product_name = title_text.split('-')[0].strip()
+        else:
+            product_name = title_text
+        log(f"Found product name from title tag")
+        return product_name
+    return None
+
+def _gallery_sources(soup, selector):
+    for img in soup.select(selector):
+        src = img.get('src')
+        if src and 'video' not in src and 'icon' not in src and 'placeholder' not in src:
+            yield src
+
+@IMAGE_CHAIN.strategy('embedded JSON')
+def _images_from_json(page, images):
+    before = len(images)
+    extract_images_from_1688_json(page.html, page.page_json, images)
+    if len(images) > before:
+        log(f"Extracted {len(images) - before} images from JSON data structures.")
+    return len(images) - before
+
+@IMAGE_CHAIN.strategy('gallery', tier=1)
+def _images_from_gallery(page, images):
+    found = images.extend(_gallery_sources(page.soup, 'div.od-gallery-turn-item-wrapper img.od-gallery-img'), 'gallery', normalize=False)
+    log(f"Fallback: Extracted {found} images from gallery selectors.")
+    return found
+
+@IMAGE_CHAIN.strategy('preview', tier=2)
+def _images_from_preview(page, images):
+    found = images.extend(_gallery_sources(page.soup, 'img.ant-image-img.preview-img'), 'preview', normalize=False)
+    log(f"Fallback: Extracted {found} images from preview selectors.")
+    return found
+
+@IMAGE_CHAIN.strategy('page sources', tier=3)
+def _images_from_page_sources(page, images):
+    before = len(images)
+    # No placeholder: finding nothing is a miss, and the html strategy still runs
+    extract_images_from_1688(page.html, page.soup, images, placeholder=False)
+    log(f"Fallback: Extracted {len(images) - before} images using extract_images_from_1688.")
+    return len(images) - before
+
+@IMAGE_CHAIN.strategy('html', tier=4)
+def _images_from_html(page, images):
+    additional_images = debug_extract_images_from_1688(page.html, page.soup, page.url or '')
+    found = images.extend((img for img in additional_images if img), 'html', normalize=False)
+    log(f"Extracted {found} additional images from HTML")
+    return found
+
+@DESCRIPTION_CHAIN.strategy('featureAttributes')
+def _description_from_feature_attributes(page):
+    feature_description = extract_description_from_feature_attributes(page.html, page.page_json)
+    if feature_description:
+        log(f"Extracted description from featureAttributes: {len(feature_description)} characters")
+    return feature_description
+
+# Placeholder description of products where every strategy failed
+NO_DESCRIPTION = "No description available."
+
+# Description containers on product pages; every matching block is kept
+DESCRIPTION_SELECTORS = [
+    '#description .html-description',
+    '#description .module-od-product-description',
+    '.desc-content',
+    '#description',
+]
+
+@DESCRIPTION_CHAIN.strategy('selectors', tier=1)
+def _description_from_selectors(page):
+    desc_blocks = []
+    for selector in DESCRIPTION_SELECTORS:
+        for block in page.soup.select(selector):
+            block_html = str(block)
+            if block_html and len(block_html) > 100:
+                desc_blocks.append(block_html)
+    if desc_blocks:
+        log(f"Found and concatenated {len(desc_blocks)} description blocks from selectors.")
+        return '\n'.join(desc_blocks)
+    return None
+
+DETAIL_URL_RE = REGEXES.compile('find_detail_url.detail_url', r'"detailUrl"\s*:\s*"([^"]+)",?')
+
+def find_detail_url(page):
+    """URL of the separate description page referenced by a product page, or None"""
+    page_json = page.page_json
+    detail_url = page_json.first('detailUrl')
+    if not detail_url and not page_json.blobs:
+        detail_url_match = DETAIL_URL_RE.search(page.html)
+        detail_url = detail_url_match.group(1) if detail_url_match else None
+    return detail_url
+
+def fetch_detail_description(detail_url, product_url):
+    """Fetch a detailUrl page with retries and a short timeout and extract its description"""
+    max_retries = 2  # Reduced from 3 to 2
+    for attempt in range(max_retries):
+        try:
+            # Shared token bucket paces retries across all workers
+            resp = cached_get(detail_url, timeout=10)  # Reduced from 30 to 10 seconds
+            if resp.status_code == 200 and len(resp.text) > 100 and not resp.is_captcha:
+                # Archive detailUrl content for debugging (and for --replay)
+                if REPLAY_SOURCE is None:
+                    HTML_ARCHIVE.save('detail', detail_url, resp.text, product_url=product_url)
+                # Extract description from the fetched content
+                detail_description = extract_description_from_detail_url(resp.text)
+                if detail_description:
+                    log(f"Successfully extracted description from detailUrl content (attempt {attempt+1})")
+                    return detail_description
+                log(f"detailUrl content fetched but no description extracted (attempt {attempt+1})")
+            else:
+                log(f"detailUrl fetch attempt {attempt+1} failed: status {resp.status_code}")
+        except Exception as e:
+            log(f"Failed to fetch detailUrl (attempt {attempt+1}): {e}", "WARNING")
+            if attempt == max_retries - 1:  # Last attempt
+                log("Skipping detailUrl fetch, will use fallback description methods", "INFO")
+    return None
+
+@DESCRIPTION_CHAIN.strategy('detailUrl', tier=2, network=True)
+def _description_from_detail_url(page):
+    detail_url = find_detail_url(page)
+    if not detail_url:
+        return None
+    log(f"Found detailUrl for description: {detail_url}")
+    return fetch_detail_description(detail_url, page.url)
+
+@DESCRIPTION_CHAIN.strategy('largest block', tier=3)
+def _description_from_largest_block(page):
+    # Needs the whole page, not just the targeted subtrees
+    best_block = largest_content_block(page.full_soup)
+    if best_block:
+        log("Used fallback: largest visible HTML/text block")
+    return best_block
+
+@DESCRIPTION_CHAIN.strategy('paragraphs', tier=4)
+def _description_from_paragraphs(page):
+    # All <p> tags concatenated (no truncation)
+    paragraphs = page.full_soup.find_all('p')
+    all_text = '\n'.join([p.get_text(strip=True) for p in paragraphs if p.get_text(strip=True)])
+    if all_text:
+        log("Used fallback: all <p> tags concatenated as description")
+    return all_text
+
+@PRICE_CHAIN.strategy('#mainPrice')
+def _price_from_main_price(page):
+    price_span = page.soup.select_one('#mainPrice .price-info.currency')
+    if price_span:
+        price_text = ''.join(price_span.stripped_strings)
+        price = price_text.replace('¥', '').strip()
+        log(f"Found price from #mainPrice: {price}")
+        return price
+    return None
+
+@PRICE_CHAIN.strategy('embedded JSON', tier=1)
+def _price_from_json(page):
+    price = page.page_json.first('price')
+    if price:
+        log(f"Found price in embedded JSON: {price}")
+    return price
+
+PRICE_RE = REGEXES.compile('price_chain.price', r'"price":"([^"]+)"')
+
+@PRICE_CHAIN.strategy('regex', tier=2)
+def _price_from_regex(page):
+    # Whole HTML: the price may sit in a script that is not a captured JSON blob
+    price_matches = PRICE_RE.findall(page.html)
+    if price_matches:
+        log(f"Found price via regex: {price_matches[0]}")
+        return price_matches[0]
+    return None
+
+@ATTRIBUTE_CHAIN.strategy('#productAttributes table')
+def _attributes_from_table(page):
+    attributes = {}
+    attr_table = page.soup.select_one('#productAttributes table')
+    if attr_table:
+        for row in attr_table.select('tr'):
+            ths = row.select('th')
+            tds = row.select('td')
+            for th, td in zip(ths, tds):
+                key = th.get_text(strip=True)
+                value = td.get_text(strip=True)
+                attributes[key] = value
+        log(f"Extracted {len(attributes)} product attributes.")
+    return attributes
+
+def extract_product_info(html_content, url, scraping_delay=2, page=None):
+    """Extract product information from HTML content (or its already-parsed page)"""
     try:
         log("Extracting product info from HTML content...")
-        soup = BeautifulSoup(html_content, 'html.parser')
+        page = page or ParsedPage(html_content, url)
         
         # --- Product Name ---
-        product_name = None
-        # Try to extract from #productTitle h1
-        title_h1 = soup.select_one('#productTitle h1')
-        if title_h1 and title_h1.text.strip():
-            product_name = title_h1.text.strip()
-            log(f"Found product name from #productTitle h1: {product_name}")
-        # Fallback to previous logic if not found
-        if not product_name:
-            title_tag = soup.find('title')
-            if title_tag and title_tag.text:
-                title_text = title_tag.text.strip()
-                if '-' in title_text:
-                    product_name = title_text.split('-')[0].strip()
-                else:
-                    product_name = title_text
-                log(f"Found product name from title tag")
+        product_name = NAME_CHAIN.run(page)
         
         # --- Product Images ---
-        images = []
-        
-        # 1. Primary method: Extract from JSON data structures (most reliable)
-        json_images = extract_images_from_1688_json(html_content)
-        if json_images:
-            images = json_images
-            log(f"Extracted {len(images)} images from JSON data structures.")
-        
-        # 2. Fallback: Main gallery images (od-gallery-img)
-        if not images:
-            gallery_imgs = soup.select('div.od-gallery-turn-item-wrapper img.od-gallery-img')
-            for img in gallery_imgs:
-                src = img.get('src')
-                if src and 'video' not in src and 'icon' not in src and 'placeholder' not in src and src not in images:
-                    images.append(src)
-            log(f"Fallback: Extracted {len(images)} images from gallery selectors.")
-        
-        # 3. Fallback: Preview images (ant-image-img preview-img)
-        if not images:
-            preview_imgs = soup.select('img.ant-image-img.preview-img')
-            for img in preview_imgs:
-                src = img.get('src')
-                if src and 'video' not in src and 'icon' not in src and 'placeholder' not in src and src not in images:
-                    images.append(src)
-            log(f"Fallback: Extracted {len(images)} images from preview selectors.")
-        
-        # 4. Fallback: use extract_images_from_1688 for more sources if still no images found
-        if not images:
-            images = extract_images_from_1688(html_content, soup)
-            log(f"Fallback: Extracted {len(images)} images using extract_images_from_1688.")
-
-        # 5. Fallback: use placeholder if still no images found
+        # One collection shared by all strategies: deduplicated, source-tagged and capped
+        images = IMAGE_CHAIN.run(page, ImageCollection(MAX_PRODUCT_IMAGES))
         if not images:
-            images = ["https://via.placeholder.com/800x800?text=No+Image+Available"]
+            images.add("https://via.placeholder.com/800x800?text=No+Image+Available", 'placeholder', normalize=False)
             log("No images found, using placeholder image.")
+        log(f"Final image count: {len(images)} "
+            f"({', '.join(f'{source}: {count}' for source, count in images.counts_by_source().items())})")
+        images = images.urls()
         
-        # Remove duplicates and log final count
-        images = list(dict.fromkeys(images))
-        log(f"Final image count: {len(images)}")
-
         # --- Product Description ---
-        description_html = None
-        
-        # 1. Primary method: Extract from featureAttributes JSON data
-        feature_description = extract_description_from_feature_attributes(html_content)
-        if feature_description:
-            description_html = feature_description
-            log(f"Extracted description from featureAttributes: {len(feature_description)} characters")
-        
-        # 2. Try all likely selectors and concatenate all matching blocks
-        if not description_html:
-            desc_selectors = [
-                '#description .html-description',
-                '#description .module-od-product-description',
-                '.desc-content',
-                '#description',
-            ]
-            desc_blocks = []
-            for selector in desc_selectors:
-                blocks = soup.select(selector)
-                for block in blocks:
-                    block_html = str(block)
-                    if block_html and len(block_html) > 100:
-                        desc_blocks.append(block_html)
-            if desc_blocks:
-                description_html = '\n'.join(desc_blocks)
-                log(f"Found and concatenated {len(desc_blocks)} description blocks from selectors.")
-        
-        # 3. Try detailUrl with retries and shorter timeout if no HTML found
-        if not description_html:
-            detail_url_match = re.search(r'"detailUrl"\s*:\s*"([^"]+)",?', html_content)
-            if detail_url_match:
-                detail_url = detail_url_match.group(1)
-                log(f"Found detailUrl for description: {detail_url}")
-                max_retries = 2  # Reduced from 3 to 2
-                for attempt in range(max_retries):
-                    try:
-                        resp = requests.get(detail_url, timeout=10)  # Reduced from 30 to 10 seconds
-                        if resp.status_code == 200 and len(resp.text) > 100:
-                            # Save detailUrl content for debugging
-                            try:
-                                detail_file = os.path.join(OUTPUT_DIR, f"detail_content_{hash(url)}.html")
-                                with open(detail_file, "w", encoding="utf-8") as f:
-                                    f.write(resp.text)
-                                log(f"Saved detailUrl content to: {detail_file}")
-                            except Exception as e:
-                                log(f"Failed to save detailUrl content: {e}", "WARNING")
-                            # Extract description from the fetched content
-                            detail_description = extract_description_from_detail_url(resp.text)
-                            if detail_description:
-                                description_html = detail_description
-                                log(f"Successfully extracted description from detailUrl content (attempt {attempt+1})")
-                                break
-                            else:
-                                log(f"detailUrl content fetched but no description extracted (attempt {attempt+1})")
-                        else:
-                            log(f"detailUrl fetch attempt {attempt+1} failed: status {resp.status_code}")
-                    except Exception as e:
-                        log(f"Failed to fetch detailUrl (attempt {attempt+1}): {e}", "WARNING")
-                        if attempt == max_retries - 1:  # Last attempt
-                            log("Skipping detailUrl fetch, will use fallback description methods", "INFO")
-                    time.sleep(1)  # Reduced delay from scraping_delay to 1 second
-        
-        # 4. Fallback: largest visible HTML/text block
-        if not description_html:
-            candidates = soup.find_all(['div', 'section'], recursive=True)
-            best_block = None
-            best_len = 0
-            for c in candidates:
-                c_html = str(c)
-                c_len = len(c_html)
-                if c_len > best_len and c_len > 200 and ('img' in c_html or len(c.get_text(strip=True)) > 100):
-                    best_block = c_html
-                    best_len = c_len
-            if best_block:
-                description_html = best_block
-                log("Used fallback: largest visible HTML/text block")
-        
-        # 5. Fallback: all <p> tags concatenated (no truncation)
-        if not description_html:
-            paragraphs = soup.find_all('p')
-            all_text = '\n'.join([p.get_text(strip=True) for p in paragraphs if p.get_text(strip=True)])
-            if all_text:
-                description_html = all_text
-                log("Used fallback: all <p> tags concatenated as description")
-        
-        # 6. Log and save raw HTML if all fail
+        description_html = DESCRIPTION_CHAIN.run(page)
+        # Log and save raw HTML if all fail
         if not description_html:
-            description_html = "No description available."
+            description_html = NO_DESCRIPTION
             log("No product description found, using fallback.")
-            try:
-                with open(os.path.join(OUTPUT_DIR, f"failed_product_{hash(url)}.html"), "w", encoding="utf-8") as f:
-                    f.write(html_content)
-                log(f"Saved raw HTML for failed product: failed_product_{hash(url)}.html", "WARNING")
-            except Exception as e:
-                log(f"Failed to save raw HTML: {e}", "WARNING")
-
+            # Worker processes leave archiving to the parent (see finish_product_record)
+            if REPLAY_SOURCE is None and not page.offline:
+                HTML_ARCHIVE.save('failed', url, html_content)
+                log(f"Archived raw HTML for failed product: {url}", "WARNING")
+        
         # --- Product Price ---
-        price = None
-        price_span = soup.select_one('#mainPrice .price-info.currency')
-        if price_span:
-            price_text = ''.join(price_span.stripped_strings)
-            price = price_text.replace('¥', '').strip()
-            log(f"Found price from #mainPrice: {price}")
-        # Fallback: regex
-        if not price:
-            price_pattern = r'"price":"([^"]+)"'
-            price_matches = re.findall(price_pattern, html_content)
-            if price_matches:
-                price = price_matches[0]
-                log(f"Found price via regex: {price}")
+        price = PRICE_CHAIN.run(page)
         if not price:
             price = '0'
             log("No price found, using fallback 0.")
-
+        
         # --- Product Attributes ---
-        attributes = {}
-        attr_table = soup.select_one('#productAttributes table')
-        if attr_table:
-            for row in attr_table.select('tr'):
-                ths = row.select('th')
-                tds = row.select('td')
-                for th, td in zip(ths, tds):
-                    key = th.get_text(strip=True)
-                    value = td.get_text(strip=True)
-                    attributes[key] = value
-            log(f"Extracted {len(attributes)} product attributes.")
-
+        attributes = ATTRIBUTE_CHAIN.run(page) or {}
+        
         # Return all extracted info
         return {
             'name': product_name,
@@ -1434,6 +3455,21 @@ def extract_product_info(html_content, url, scraping_delay=2):
         log(f"Error extracting product info: {str(e)}", "ERROR")
         return None
 
+# Patterns used by clean_description
+STYLE_BLOCK_RE = REGEXES.compile('clean_description.style', r'<style[^>]*>.*?</style>', re.DOTALL | re.IGNORECASE)
+STYLE_BLOCK_CASE_RE = REGEXES.compile('clean_description.style_case_sensitive', r'<style[^>]*>.*?</style>', re.DOTALL)
+LOCAL_WP_IMAGE_RE = REGEXES.compile('clean_description.local_wp_image', r'http://mikel\.local/wp-content/.*?\.(?:png|jpg|jpeg|gif|webp)\b', re.IGNORECASE)
+MARKETPLACE_DOMAIN_RES = [
+    REGEXES.compile(f'clean_description.domain.{domain}', rf'(?i){re.escape(domain)}\.com')
+    for domain in ('1688', 'alibaba', 'taobao', 'tmall', 'aliexpress')
+]
+ORIGIN_PHRASE_RES = [
+    REGEXES.compile(f"clean_description.phrase.{phrase.replace(' ', '_')}", rf'(?i){phrase}')
+    for phrase in ('made in china', 'china wholesale', 'chinese supplier')
+]
+WHITESPACE_RE = REGEXES.compile('clean_description.whitespace', r'\s+')
+DISALLOWED_CHARS_RE = REGEXES.compile('clean_description.disallowed_chars', r'[^\w\s\-\.\,\|\:\;\(\)\[\]\{\}\<\>\"\']+')
+
 def clean_description(description):
     """Clean unwanted text from product descriptions while preserving HTML structure"""
     if not description:
@@ -1443,25 +3479,17 @@ def clean_description(description):
     if '<table' in description and '</table>' in description:
         # For HTML descriptions, only remove very specific unwanted patterns
         # Remove CSS styles that might interfere
-        description = re.sub(r'<style[^>]*>.*?</style>', '', description, flags=re.DOTALL | re.IGNORECASE)
+        description = STYLE_BLOCK_RE.sub('', description)
         
         # Remove local WordPress image URLs
-        description = re.sub(r'http://mikel\.local/wp-content/.*?\.(?:png|jpg|jpeg|gif|webp)\b', '', description, flags=re.IGNORECASE)
+        description = LOCAL_WP_IMAGE_RE.sub('', description)
         
         # Remove very specific unwanted patterns but preserve table structure
-        unwanted_patterns = [
-            r'(?i)1688\.com',
-            r'(?i)alibaba\.com',
-            r'(?i)taobao\.com',
-            r'(?i)tmall\.com',
-            r'(?i)aliexpress\.com'
-        ]
-        
-        for pattern in unwanted_patterns:
-            description = re.sub(pattern, '', description)
+        for pattern in MARKETPLACE_DOMAIN_RES:
+            description = pattern.sub('', description)
         
         # Clean up extra whitespace but preserve HTML structure
-        description = re.sub(r'\s+', ' ', description)
+        description = WHITESPACE_RE.sub(' ', description)
         description = description.strip()
         
         return description
@@ -1469,33 +3497,22 @@ def clean_description(description):
     else:
         # For plain text descriptions, use the original cleaning logic
         # Remove CSS styles
-        description = re.sub(r'<style[^>]*>.*?</style>', '', description, flags=re.DOTALL)
+        description = STYLE_BLOCK_CASE_RE.sub('', description)
 
         # Remove local WordPress image URLs
-        description = re.sub(r'http://mikel\.local/wp-content/.*?\.(?:png|jpg|jpeg|gif|webp)\b', '', description, flags=re.IGNORECASE)
+        description = LOCAL_WP_IMAGE_RE.sub('', description)
 
         # Check if this is a structured description (contains | separators)
         is_structured = '|' in description
         
         # Common Alibaba-related patterns to remove (only for non-structured descriptions)
         if not is_structured:
-            patterns_to_remove = [
-                r'(?i)1688\.com',
-                r'(?i)alibaba\.com',
-                r'(?i)taobao\.com',
-                r'(?i)tmall\.com',
-                r'(?i)aliexpress\.com',
-                r'(?i)made in china',
-                r'(?i)china wholesale',
-                r'(?i)chinese supplier'
-            ]
-            
-            for pattern in patterns_to_remove:
-                description = re.sub(pattern, '', description)
+            for pattern in MARKETPLACE_DOMAIN_RES + ORIGIN_PHRASE_RES:
+                description = pattern.sub('', description)
         
         # Clean up extra whitespace and punctuation
-        description = re.sub(r'\s+', ' ', description)
-        description = re.sub(r'[^\w\s\-\.\,\|\:\;\(\)\[\]\{\}\<\>\"\']+', '', description)
+        description = WHITESPACE_RE.sub(' ', description)
+        description = DISALLOWED_CHARS_RE.sub('', description)
         description = description.strip()
         
         return description
@@ -1542,17 +3559,44 @@ def check_description_quality(description, language):
     
     return True, "Description quality OK"
 
-def process_product_for_woocommerce(product_info, html_content, url, language='en'):
+def contains_chinese(text):
+    """True if text has any CJK unified ideograph"""
+    return any('\u4e00' <= char <= '\u9fff' for char in text)
+
+def csv_plain_text(text):
+    """Text of an HTML field as it is written to the CSV: tags and entities removed, whitespace collapsed"""
+    text = re.sub(r'<[^>]+>', '', text)
+    text = text.replace('&quot;', '"').replace('&amp;', '&').replace('&lt;', '<').replace('&gt;', '>')
+    return re.sub(r'\s+', ' ', text).strip()
+
+# Translated product fields that are exported (the description is left blank)
+TRANSLATED_FIELDS = ('Name', 'Attribute 1 name', 'Attribute 1 value(s)', 'Attribute 2 name', 'Attribute 2 value(s)')
+
+def finish_product_translation(product):
+    """Record a product's translation status.
+    
+    Sets 'Translation status' to 'translated', or to 'untranslated' with the
+    exported fields still containing Chinese in 'Untranslated fields', so that
+    export_to_csv never has to call a translator.
+    """
+    untranslated = [field for field in TRANSLATED_FIELDS if contains_chinese(product.get(field) or '')]
+    product['Translation status'] = 'untranslated' if untranslated else 'translated'
+    product['Untranslated fields'] = '|'.join(untranslated)
+    return product
+
+def process_product_for_woocommerce(product_info, html_content, url, language='en', page=None):
     """Process product data for WooCommerce import"""
     try:
         woo_product = WooCommerceProduct()
+        page = page or ParsedPage(html_content, url)
         
         # Extract basic product information
         name = (product_info.get('name') or '').strip()
         description = (product_info.get('description') or '').strip()
         category = (product_info.get('category') or '').strip()
         price = (product_info.get('price') or '0').strip()
-        images = [img for img in product_info.get('images', []) if img and isinstance(img, str)]
+        images = ImageCollection()
+        images.extend((img for img in product_info.get('images', []) if img and isinstance(img, str)), 'product', normalize=False)
         
         # Debug: Log the raw description
         if not description:
@@ -1561,79 +3605,11 @@ def process_product_for_woocommerce(product_info, html_content, url, language='e
             log(f"Raw description length: {len(description)} characters", "INFO")
             log(f"Raw description: {description[:200]}...", "INFO")
         
-        # Check if description contains HTML tables
-        is_html_description = '<table' in description and '</table>' in description
-        
-        # Translate content to the specified language
-        translated_name = translate_text(name, 'zh', language)
-        
-        if is_html_description:
-            # For HTML descriptions, extract text content and translate it
-            log(f"Extracting text from HTML for translation", "INFO")
-            # Use BeautifulSoup to extract text content
-            soup = BeautifulSoup(description, 'html.parser')
-            text_content = soup.get_text(separator=' ', strip=True)
-            # Clean up extra whitespace
-            text_content = re.sub(r'\s+', ' ', text_content).strip()
-            log(f"Extracted text content: {text_content[:200]}...", "INFO")
-            # Translate the extracted text
-            translated_description = translate_text(text_content, 'zh', language)
-            log(f"Translated HTML content to {language}", "INFO")
-        else:
-            # For plain text descriptions, translate normally
-            translated_description = translate_text(description, 'zh', language)
-        
-        # Debug: Log the translated description
-        if translated_description:
-            log(f"Translated description length: {len(translated_description)} characters", "INFO")
-            log(f"Translated description: {translated_description[:200]}...", "INFO")
-        else:
-            log(f"No translated description available", "INFO")
-        
-        # Clean the translated description
-        cleaned_description = clean_description(translated_description)
-        
-        # Debug: Log the cleaned description
-        if cleaned_description:
-            log(f"Cleaned description length: {len(cleaned_description)} characters", "INFO")
-            log(f"Cleaned description: {cleaned_description[:200]}...", "INFO")
-        else:
-            log("Cleaning resulted in empty description", "INFO")
-        
-        # Check description quality
-        quality_ok, quality_message = check_description_quality(cleaned_description, language)
-        if not quality_ok:
-            log(f"⚠️ Description quality issue: {quality_message}", "WARNING")
-            # Try to improve the description
-            if language == 'ar' and 'chinese' in quality_message.lower():
-                log("🔄 Attempting to retranslate to Arabic...", "INFO")
-                # Force retranslation to Arabic
-                retry_description = translate_text(description, 'zh', 'ar')
-                cleaned_description = clean_description(retry_description)
-                quality_ok, quality_message = check_description_quality(cleaned_description, language)
-                if quality_ok:
-                    log("✅ Retranslation successful", "INFO")
-                else:
-                    log(f"❌ Retranslation failed: {quality_message}", "WARNING")
-            elif language == 'en' and 'chinese' in quality_message.lower():
-                log("🔄 Attempting to retranslate to English...", "INFO")
-                # Force retranslation to English
-                retry_description = translate_text(description, 'zh', 'en')
-                cleaned_description = clean_description(retry_description)
-                quality_ok, quality_message = check_description_quality(cleaned_description, language)
-                if quality_ok:
-                    log("✅ Retranslation successful", "INFO")
-                else:
-                    log(f"❌ Retranslation failed: {quality_message}", "WARNING")
-        else:
-            log(f"✅ Description quality: {quality_message}", "INFO")
-        
-        # If we still don't have a description, use only the product name (no generic content)
-        if not cleaned_description or cleaned_description.strip() in ('.', '-'):
-            log("No valid description found, using only product name", "INFO")
-            cleaned_description = translated_name
+        # Only the name is translated: the description is exported blank (see
+        # set_basic_info below), so translating it would only cost provider calls
+        translated_name = translate_text(name, 'zh', language, page)
         
-        # Set basic product information with cleaned description
+        # Set basic product information
         woo_product.set_basic_info(
             name=translated_name,
             description="",  # Intentionally left blank per user request
@@ -1646,24 +3622,13 @@ def process_product_for_woocommerce(product_info, html_content, url, language='e
         # Add category
         woo_product.add_category("Imported Products")
         
-        # Extract additional images from HTML if not enough
-        if len(images) < 5:  # Try to get at least 5 images
-            additional_images = debug_extract_images_from_1688(html_content, BeautifulSoup(html_content, 'html.parser'), url)
-            for img in additional_images:
-                if img and img not in images:
-                    images.append(img)
-            
-            log(f"Extracted {len(additional_images)} additional images from HTML")
-        
-        # Add valid image URLs to the product
-        valid_urls = []  # Use a list to preserve order
-        for img_url in images:
-            if not img_url or not isinstance(img_url, str):
-                continue
-            # Clean the URL
-            clean_url = fix_image_url(img_url)
-            if not clean_url or 'http' not in clean_url:
-                log(f"Skipping invalid image URL: {img_url[:100]}...", "DEBUG")
+        # Images short of MIN_PRODUCT_IMAGES were already topped up by IMAGE_CHAIN
+        # Add valid image URLs to the product (normalized and deduplicated in one pass)
+        valid_urls = ImageCollection(MAX_PRODUCT_IMAGES)
+        for clean_url in normalize_image_urls(images):
+            if valid_urls.full:
+                break
+            if 'http' not in clean_url:
                 continue
             # Remove any JSON data from the URL
             if '{' in clean_url or '}' in clean_url:
@@ -1677,7 +3642,7 @@ def process_product_for_woocommerce(product_info, html_content, url, language='e
                                 clean_url = fix_image_url(clean_url)
                                 break
                 except (json.JSONDecodeError, TypeError):
-                    url_match = re.search(r'https?://[^\s\"\']+', clean_url)
+                    url_match = IMAGE_URL_IN_TEXT_RE.search(clean_url)
                     if url_match:
                         clean_url = url_match.group(0)
                         clean_url = fix_image_url(clean_url)
@@ -1694,14 +3659,14 @@ def process_product_for_woocommerce(product_info, html_content, url, language='e
                 if 'b2b-1702133787_s.jpeg' in clean_url:
                     log(f"Skipping known invalid image URL: {clean_url[:100]}...", "DEBUG")
                     continue
-                valid_urls.append(clean_url)
+                valid_urls.add(clean_url, images.source_of(clean_url) or 'product', normalize=False)
                 log(f"Using image URL: {clean_url[:100]}...")
         # Set images as comma-separated string
-        woo_product.data['Images'] = ','.join(valid_urls)
+        woo_product.data['Images'] = ','.join(valid_urls.urls())
         
         log(f"Processed {len(valid_urls)} image URLs for WooCommerce import")
         
-        return woo_product.to_dict()
+        return finish_product_translation(woo_product.to_dict())
         
     except Exception as e:
         log(f"Error processing product for WooCommerce: {str(e)}", "ERROR")
@@ -1735,22 +3700,12 @@ def export_to_csv(products, output_file, language='en'):
                 # Clean and prepare description for CSV
                 description = product.get('Description', '')
                 if description:
-                    # Remove HTML tags and convert to plain text for CSV compatibility
-                    description = re.sub(r'<[^>]+>', '', description)
-                    # Replace HTML entities
-                    description = description.replace('&quot;', '"').replace('&amp;', '&').replace('&lt;', '<').replace('&gt;', '>')
-                    # Clean up extra whitespace
-                    description = re.sub(r'\s+', ' ', description).strip()
-                    
-                    # Translate the stripped plain text description if it contains Chinese characters
-                    if description and any('\u4e00' <= char <= '\u9fff' for char in description):
-                        try:
-                            translated_desc = translate_text(description, 'zh', language)
-                            if translated_desc and translated_desc != description:
-                                description = translated_desc
-                                log(f"Translated description for CSV export to {language}: {len(description)} characters")
-                        except Exception as e:
-                            log(f"Translation failed during CSV export: {str(e)}", "WARNING")
+                    # Plain text for CSV compatibility; export never translates
+                    # (the status comes from finish_product_translation)
+                    description = csv_plain_text(description)
+                if product.get('Translation status') != 'translated':
+                    log(f"Exporting {product.get('SKU', '')} with untranslated text "
+                        f"({product.get('Untranslated fields') or 'status unknown'})", "WARNING")
                 
                 # Prepare short description (first 200 characters)
                 short_description = description[:200] + '...' if len(description) > 200 else description
@@ -1859,21 +3814,38 @@ def clean_up_temp_files():
         log(f"Error during cleanup: {str(e)}", "ERROR")
 
 def read_urls_from_file(filename):
-    """Read URLs from a text file, one per line, removing duplicates"""
+    """Read URLs from a text file, one per line, removing duplicates.
+    
+    Offer URLs are normalized to https://detail.1688.com/offer/<id>.html, so the
+    same product listed with different spm/traceId query strings is fetched once.
+    """
     try:
         with open(filename, 'r', encoding='utf-8') as f:
             urls = [line.strip() for line in f if line.strip() and not line.strip().startswith('#')]
         
         # Remove duplicates while preserving order
+        seen_raw = set()
         seen = set()
         unique_urls = []
+        exact_duplicates = 0
+        variant_duplicates = 0
         for url in urls:
-            if url not in seen:
-                seen.add(url)
-                unique_urls.append(url)
+            if url in seen_raw:
+                exact_duplicates += 1
+                continue
+            seen_raw.add(url)
+            canonical = canonical_url(url)
+            if canonical in seen:
+                variant_duplicates += 1
+                log(f"Duplicate product URL skipped: {url} -> {canonical}", "DEBUG")
+                continue
+            seen.add(canonical)
+            unique_urls.append(canonical)
         
-        if len(unique_urls) < len(urls):
-            log(f"Removed {len(urls) - len(unique_urls)} duplicate URLs", "INFO")
+        offer_urls = sum(1 for url in unique_urls if offer_id_from_url(url))
+        log(f"URL dedupe: {len(urls)} listed, {exact_duplicates} exact duplicates, "
+            f"{variant_duplicates} same-offer variants, {len(unique_urls)} unique "
+            f"({offer_urls} offer pages)", "INFO")
         
         return unique_urls
     except Exception as e:
@@ -1907,43 +3879,32 @@ def cleanup_old_data():
     except Exception as e:
         log(f"Error in cleanup_old_data: {str(e)}", "ERROR")
 
-def extract_product_data_from_json(html_content):
+def extract_product_data_from_json(html_content, page_json=None):
     """
     Extract real product data from embedded JSON in 1688 HTML pages.
     This is the primary method to get actual product data without generic text.
     """
     try:
         log("Extracting product data from embedded JSON...")
+        page_json = page_json or parse_page_json(html_content)
         
-        # Look for the main JSON data structure that contains product information
-        # This is typically in a script tag with window.runParams or similar
-        json_patterns = [
-            r'window\.runParams\s*=\s*({.+?});',
-            r'window\.detailData\s*=\s*({.+?});',
-            r'window\.__INITIAL_STATE__\s*=\s*({.+?});',
-            r'window\.productData\s*=\s*({.+?});',
-            r'window\.offerData\s*=\s*({.+?});',
-            r'window\.data\s*=\s*({.+?});'
-        ]
+        # The main JSON data structure that contains product information is
+        # typically assigned to window.runParams or similar
+        json_blob_names = ['runParams', 'detailData', '__INITIAL_STATE__', 'productData', 'offerData', 'data']
         
         product_data = {}
         
-        for pattern in json_patterns:
-            matches = re.findall(pattern, html_content, re.DOTALL)
-            if matches:
-                try:
-                    json_data = json.loads(matches[0])
-                    log(f"Found JSON data structure with {len(json_data)} top-level keys")
-                    
-                    # Extract product information from the JSON structure
-                    extracted_data = extract_from_json_structure(json_data)
-                    if extracted_data:
-                        product_data.update(extracted_data)
-                        log(f"Successfully extracted data from JSON pattern: {pattern[:50]}...")
-                        break
-                except json.JSONDecodeError as e:
-                    log(f"Failed to parse JSON from pattern {pattern[:50]}...: {e}", "WARNING")
-                    continue
+        for name in json_blob_names:
+            json_data = page_json.blob(name)
+            if isinstance(json_data, dict):
+                log(f"Found JSON data structure with {len(json_data)} top-level keys")
+                
+                # Extract product information from the JSON structure
+                extracted_data = extract_from_json_structure(json_data)
+                if extracted_data:
+                    product_data.update(extracted_data)
+                    log(f"Successfully extracted data from window.{name}")
+                    break
         
         # If no JSON found in script tags, try to find JSON in the HTML body
         if not product_data:
@@ -2164,10 +4125,294 @@ def extract_from_body_patterns(pattern, matches):
         log(f"Error extracting from body patterns: {str(e)}", "ERROR")
         return {}
 
-def main(scraping_delay=2, language='en'):
+def save_page_content(url, html_content):
+    """Queue fetched HTML for the compressed archive (written in the background)"""
+    if REPLAY_SOURCE is not None:
+        # Replayed pages are already archived
+        return
+    HTML_ARCHIVE.save('page', url, html_content)
+
+# Worker processes for the CPU stage; 0 keeps parsing and extraction on threads
+EXTRACTION_PROCESSES = 0
+
+def extraction_worker_config():
+    """Settings an extraction worker process needs from this process"""
+    return {
+        'html_parser': HTML_PARSER,
+        'targeted_parsing': TARGETED_PARSING,
+        'detail_description_max_chars': DETAIL_DESCRIPTION_MAX_CHARS,
+        'max_product_images': MAX_PRODUCT_IMAGES,
+    }
+
+def _init_extraction_worker(config):
+    """Process pool initializer: apply the parent's settings in the worker"""
+    global DETAIL_DESCRIPTION_MAX_CHARS, MAX_PRODUCT_IMAGES
+    configure_html_parser(config['html_parser'], config['targeted_parsing'])
+    DETAIL_DESCRIPTION_MAX_CHARS = config['detail_description_max_chars']
+    MAX_PRODUCT_IMAGES = config['max_product_images']
+
+def make_extraction_pool(processes):
+    """Process pool for parsing and extraction, or None when disabled.
+    
+    Workers are spawned rather than forked: this process already runs
+    background threads (archive writer, session pool) whose locks a fork
+    could copy in a held state.
+    """
+    if processes <= 0:
+        return None
+    return ProcessPoolExecutor(
+        max_workers=processes,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=_init_extraction_worker,
+        initargs=(extraction_worker_config(),),
+    )
+
+def extract_product_record(html_content, url, scraping_delay=2):
+    """Worker side of the process-pool CPU stage: parse and extract one page.
+    
+    Runs without network or archive access and returns a compact, picklable
+    record: the product info, the detailUrl to fetch if the description chain
+    got that far, the text of parsed HTML fragments and the extractor timings.
+    """
+    page = ParsedPage(html_content, url, offline=True)
+    product_info = extract_product_info(html_content, url, scraping_delay=scraping_delay, page=page)
+    if product_info and product_info['description'] != NO_DESCRIPTION:
+        # Processing needs the description as text; tokenize it here, not in the parent
+        html_to_text(product_info['description'], page)
+    deferred_detail = ('description', 'detailUrl') in page.deferred
+    return {
+        'product_info': product_info,
+        'detail_url': find_detail_url(page) if product_info and deferred_detail else None,
+        'fragment_text': page._fragment_text,
+        'extractions': page.extractions,
+    }
+
+def finish_product_record(record, html_content, url):
+    """Parent side of the process-pool CPU stage.
+    
+    Merges the worker's extractor timings, runs the deferred detailUrl fetch
+    through this process's rate limiter and cache, and returns
+    (product_info, page) with a ParsedPage that reuses the worker's text.
+    """
+    for field, name, seconds, success in record['extractions']:
+        chain = EXTRACTOR_CHAINS[field]
+        chain.record(chain.strategy_named(name), seconds, success)
+    page = ParsedPage(html_content, url)
+    page._fragment_text.update(record['fragment_text'])
+    product_info = record['product_info']
+    if not product_info:
+        return None, page
+    detail_strategy = DESCRIPTION_CHAIN.strategy_named('detailUrl')
+    # A demoted strategy only runs when every other one failed, as in run()
+    if record['detail_url'] and not (detail_strategy.demoted and product_info['description'] != NO_DESCRIPTION):
+        log(f"Found detailUrl for description: {record['detail_url']}")
+        started = time.perf_counter()
+        detail_description = fetch_detail_description(record['detail_url'], url)
+        DESCRIPTION_CHAIN.record(detail_strategy, time.perf_counter() - started, bool(detail_description))
+        if detail_description:
+            # Preferred over the fallback the worker settled for
+            product_info['description'] = detail_description
+    if product_info['description'] == NO_DESCRIPTION and REPLAY_SOURCE is None:
+        HTML_ARCHIVE.save('failed', url, html_content)
+        log(f"Archived raw HTML for failed product: {url}", "WARNING")
+    return product_info, page
+
+def translate_product(product_info, html_content, url, language='en', page=None):
+    """Process (translate) extracted product info for WooCommerce. Returns the product dict or None"""
+    log(f"Processing product info: {json.dumps(product_info, ensure_ascii=False, indent=2)}", "DEBUG")
+    woocommerce_product = process_product_for_woocommerce(product_info, html_content, url, language, page)
+    if woocommerce_product:
+        log(f"Successfully processed WooCommerce product: {json.dumps(woocommerce_product, ensure_ascii=False, indent=2)}", "DEBUG")
+        return woocommerce_product
+    
+    log("Failed to process product for WooCommerce", "ERROR")
+    return None
+
+class TranslationStage:
+    """Translation stage with its own worker pool and queue.
+    
+    Extracted products are handed over with submit() and the fetching worker
+    moves on to its next URL, so fetching and translating overlap and each
+    pool is sized on its own. Queue depth and throughput are logged every
+    report_every products.
+    """
+    def __init__(self, workers=4, report_every=25):
+        self.workers = max(1, workers)
+        self.report_every = max(1, report_every)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='translate')
+        self._lock = threading.Lock()
+        self._opened_at = time.monotonic()
+        self.stats = {'submitted': 0, 'started': 0, 'completed': 0, 'failed': 0,
+                      'max_queue_depth': 0, 'busy_seconds': 0.0}
+
+    def submit(self, product_info, html_content, url, language='en', page=None):
+        """Queue a product for translation; returns a Future for the product dict (or None)"""
+        with self._lock:
+            self.stats['submitted'] += 1
+            queue_depth = self.stats['submitted'] - self.stats['started']
+            self.stats['max_queue_depth'] = max(self.stats['max_queue_depth'], queue_depth)
+        return self._executor.submit(self._translate, product_info, html_content, url, language, page)
+
+    def _translate(self, product_info, html_content, url, language, page):
+        with self._lock:
+            self.stats['started'] += 1
+        started = time.perf_counter()
+        woocommerce_product = None
+        try:
+            woocommerce_product = translate_product(product_info, html_content, url, language, page)
+        except Exception as e:
+            log(f"Error translating product {url}: {str(e)}", "ERROR")
+        finally:
+            with self._lock:
+                self.stats['completed'] += 1
+                self.stats['failed'] += int(woocommerce_product is None)
+                self.stats['busy_seconds'] += time.perf_counter() - started
+                report = self.stats['completed'] % self.report_every == 0
+            if report:
+                log(self.progress())
+        return woocommerce_product
+
+    def progress(self):
+        """One-line summary of queue depth and throughput"""
+        with self._lock:
+            stats = dict(self.stats)
+        elapsed = max(time.monotonic() - self._opened_at, 1e-9)
+        return (f"Translation stage: {stats['completed']}/{stats['submitted']} products done, "
+                f"{stats['submitted'] - stats['started']} queued (max {stats['max_queue_depth']}), "
+                f"{stats['completed'] / elapsed:.2f} products/s, "
+                f"{self.workers} workers {min(stats['busy_seconds'] / (elapsed * self.workers), 1.0):.0%} busy")
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+
+def scrape_url(i, current_url, total, scraping_delay=2, language='en', extraction_pool=None, translation_stage=None):
+    """Fetch, extract and process a single URL. Returns the WooCommerce product dict or None.
+    
+    With a translation_stage, processing is queued there and the result is a
+    Future for the product dict instead.
+    """
+    try:
+        log(f"\nProcessing URL ({i+1}/{total}): {current_url}")
+        
+        # Fetch the page
+        html_content = fetch_page_with_cloudscraper(current_url)
+        if not html_content:
+            log(f"Failed to fetch page: {current_url}", "ERROR")
+            return None
+        
+        # Always save HTML content for debugging
+        save_page_content(current_url, html_content)
+            
+        if extraction_pool is not None:
+            # Parsing and extraction run in a worker process
+            record = extraction_pool.submit(extract_product_record, html_content, current_url, scraping_delay).result()
+            product_info, page = finish_product_record(record, html_content, current_url)
+        else:
+            # Parsed once here and shared by extraction and processing
+            page = ParsedPage(html_content, current_url)
+            
+            # Extract product info
+            product_info = extract_product_info(html_content, current_url, scraping_delay=scraping_delay, page=page)
+        if not product_info:
+            log(f"Failed to extract product info from: {current_url}", "ERROR")
+            return None
+            
+        # Process for WooCommerce
+        if translation_stage is not None:
+            return translation_stage.submit(product_info, html_content, current_url, language, page)
+        return translate_product(product_info, html_content, current_url, language, page)
+    except Exception as e:
+        log(f"Error processing URL {current_url}: {str(e)}", "ERROR")
+        return None
+
+async def fetch_page_async(url, io_executor):
+    """Fetch a page without blocking the event loop.
+    
+    cloudscraper has no asyncio client, so the blocking fetch runs on the
+    I/O executor; per-host caps are enforced by HOST_LIMITER inside it.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(io_executor, fetch_page_with_cloudscraper, url)
+
+async def scrape_url_async(i, current_url, total, scraping_delay, language, io_executor, cpu_executor, in_flight,
+                           translation_stage=None):
+    """Asyncio version of scrape_url: network on the I/O executor, parsing on the CPU executor
+    and translation on the translation stage (or the I/O executor without one)"""
+    loop = asyncio.get_running_loop()
+    try:
+        async with in_flight:
+            log(f"\nProcessing URL ({i+1}/{total}): {current_url}")
+            html_content = await fetch_page_async(current_url, io_executor)
+        if not html_content:
+            log(f"Failed to fetch page: {current_url}", "ERROR")
+            return None
+        
+        save_page_content(current_url, html_content)
+        
+        # Parsing and extraction are CPU-bound; keep them off the event loop.
+        if isinstance(cpu_executor, ProcessPoolExecutor):
+            # Only a compact record comes back from the worker process; the
+            # deferred detailUrl fetch is network-bound
+            record = await loop.run_in_executor(
+                cpu_executor, extract_product_record, html_content, current_url, scraping_delay
+            )
+            product_info, page = await loop.run_in_executor(
+                io_executor, finish_product_record, record, html_content, current_url
+            )
+        else:
+            # The page is tokenized once there and reused by processing below.
+            page = ParsedPage(html_content, current_url)
+            product_info = await loop.run_in_executor(
+                cpu_executor, extract_product_info, html_content, current_url, scraping_delay, page
+            )
+        if not product_info:
+            log(f"Failed to extract product info from: {current_url}", "ERROR")
+            return None
+        
+        # Translation is network-bound
+        if translation_stage is not None:
+            return await asyncio.wrap_future(
+                translation_stage.submit(product_info, html_content, current_url, language, page)
+            )
+        return await loop.run_in_executor(
+            io_executor, translate_product, product_info, html_content, current_url, language, page
+        )
+    except Exception as e:
+        log(f"Error processing URL {current_url}: {str(e)}", "ERROR")
+        return None
+
+async def scrape_urls_async(urls, scraping_delay=2, language='en', max_in_flight=200, cpu_workers=None,
+                            extraction_pool=None, translation_stage=None):
+    """Process all URLs with asyncio, keeping up to max_in_flight requests open.
+    
+    Parsing runs on extraction_pool (worker processes) if given, else on a
+    thread pool; translation runs on translation_stage if given. Results are
+    returned in the same order as urls.
+    """
+    cpu_workers = cpu_workers or os.cpu_count() or 1
+    in_flight = asyncio.Semaphore(max_in_flight)
+    parse_threads = None
+    if extraction_pool is None:
+        parse_threads = ThreadPoolExecutor(max_workers=cpu_workers, thread_name_prefix='parse')
+    cpu_executor = extraction_pool or parse_threads
+    try:
+        with ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix='fetch') as io_executor:
+            tasks = [
+                scrape_url_async(i, url, len(urls), scraping_delay, language, io_executor, cpu_executor, in_flight,
+                                 translation_stage)
+                for i, url in enumerate(urls)
+            ]
+            return await asyncio.gather(*tasks)
+    finally:
+        if parse_threads is not None:
+            parse_threads.shutdown()
+
+def main(scraping_delay=2, language='en', workers=1, fetch_mode=None, replay_dir=None):
     """Main function to run the WooCommerce 1688 scraper"""
+    global REPLAY_SOURCE, DETAIL_DESCRIPTION_MAX_CHARS, MAX_PRODUCT_IMAGES, EXTRACTION_PROCESSES
     try:
         log("Starting WooCommerce 1688 Scraper...")
+        started = time.monotonic()
         
         # Read language setting from temporary settings file if it exists
         temp_settings_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'temp_scraper_settings.json')
@@ -2176,6 +4421,8 @@ def main(scraping_delay=2, language='en'):
                 with open(temp_settings_path, 'r', encoding='utf-8') as f:
                     settings = json.load(f)
                     language = settings.get('language', 'en')
+                    workers = int(settings.get('workers', workers))
+                    fetch_mode = settings.get('fetch_mode', fetch_mode)
                     # The GUI now passes proper language codes ('en', 'ar', 'fr')
                     # so we don't need to convert from language names
                     log(f"Using language: {language}")
@@ -2186,51 +4433,93 @@ def main(scraping_delay=2, language='en'):
             log(f"Temp settings file not found at: {temp_settings_path}", "INFO")
             log(f"Using default language: {language}", "INFO")
         
+        scraper_settings = load_scraper_settings()
+        fetch_mode = fetch_mode or scraper_settings.get('fetch_mode', 'threads')
+        max_in_flight = max(1, int(scraper_settings.get('max_in_flight', 200)))
+        configure_session_pool(scraper_settings, max_in_flight if fetch_mode == 'async' else workers)
+        HOST_LIMITER.configure(scraper_settings.get('host_concurrency'))
+        RATE_LIMITER.configure(scraper_settings.get('rate_limits'))
+        ADAPTIVE_CONCURRENCY.configure(scraper_settings.get('adaptive_concurrency', {}))
+        RESPONSE_CACHE.configure(scraper_settings.get('response_cache', {}))
+        TRANSLATION_CACHE.configure(scraper_settings.get('translation_cache', {}))
+        TRANSLATION_ROUTER.configure(scraper_settings.get('translation_router', {}))
+        TRANSLATION_ROUTER.reset()
+        translation_workers = max(0, int(scraper_settings.get('translation_workers', 0)))
+        TRANSLATION_BATCHER.configure(scraper_settings.get('translation_batching', {}),
+                                      concurrent=translation_workers > 1 if translation_workers
+                                      else fetch_mode == 'async' or workers > 1)
+        DETAIL_DESCRIPTION_MAX_CHARS = int(scraper_settings.get('detail_description_max_chars', 20000))
+        MAX_PRODUCT_IMAGES = int(scraper_settings.get('max_product_images', 20))
+        EXTRACTION_PROCESSES = max(0, int(scraper_settings.get('extraction_processes', 0)))
+        STAGE_STATS.reset()
+        REGEXES.reset()
+        for chain in EXTRACTOR_CHAINS.values():
+            chain.reset()
+        targeted_parsing = scraper_settings.get('targeted_parsing', True)
+        html_parser = configure_html_parser(scraper_settings.get('html_parser', 'auto'), targeted_parsing)
+        log(f"HTML parser backend: {html_parser}{' (targeted)' if targeted_parsing else ''}")
+        
         # Create necessary directories
         # Note: Removed product_images folder creation as it's not needed
-        
-        # Read URLs from file
-        urls = read_urls_from_file('urls.txt')
-        if not urls:
-            log("No URLs found in urls.txt", "ERROR")
-            return
+        os.makedirs(OUTPUT_DIR, exist_ok=True)
+        
+        if replay_dir:
+            # Offline run: pages come from the archive, nothing goes over the network
+            REPLAY_SOURCE = ReplaySource(replay_dir)
+            urls = REPLAY_SOURCE.load()
+            if not urls:
+                log(f"No archived pages found in {replay_dir}", "ERROR")
+                return
+        else:
+            # Read URLs from file
+            urls = read_urls_from_file('urls.txt')
+            if not urls:
+                log("No URLs found in urls.txt", "ERROR")
+                return
             
         log(f"Found {len(urls)} URLs to process")
         
-        all_products = []
-        
-        for i, current_url in enumerate(urls):
-            log(f"\nProcessing URL ({i+1}/{len(urls)}): {current_url}")
-            
-            # Fetch the page
-            html_content = fetch_page_with_cloudscraper(current_url)
-            if not html_content:
-                log(f"Failed to fetch page: {current_url}", "ERROR")
-                continue
-            
-            # Always save HTML content for debugging
-            html_filename = os.path.join(OUTPUT_DIR, f'page_content_{i}.html')
-            try:
-                with open(html_filename, 'w', encoding='utf-8') as f:
-                    f.write(html_content)
-                log(f"Saved HTML content to {html_filename}")
-            except Exception as e:
-                log(f"Failed to save HTML content: {e}", "WARNING")
-                
-            # Extract product info
-            product_info = extract_product_info(html_content, current_url, scraping_delay=scraping_delay)
-            if not product_info:
-                log(f"Failed to extract product info from: {current_url}", "ERROR")
-                continue
-                
-            # Process for WooCommerce
-            log(f"Processing product info: {json.dumps(product_info, ensure_ascii=False, indent=2)}", "DEBUG")
-            woocommerce_product = process_product_for_woocommerce(product_info, html_content, current_url, language)
-            if woocommerce_product:
-                log(f"Successfully processed WooCommerce product: {json.dumps(woocommerce_product, ensure_ascii=False, indent=2)}", "DEBUG")
-                all_products.append(woocommerce_product)
+        # Worker processes only pay off when several pages are parsed at once
+        extraction_pool = None
+        if fetch_mode == 'async' or workers > 1:
+            extraction_pool = make_extraction_pool(EXTRACTION_PROCESSES)
+        if extraction_pool is not None:
+            log(f"Parsing and extraction in {EXTRACTION_PROCESSES} worker processes")
+        # Products are translated on their own pool while fetching moves on
+        translation_stage = TranslationStage(translation_workers) if translation_workers else None
+        if translation_stage is not None:
+            log(f"Translating with {translation_workers} translation workers")
+        try:
+            if fetch_mode == 'async':
+                log(f"Processing with asyncio pipeline (max {max_in_flight} requests in flight)")
+                results = asyncio.run(scrape_urls_async(urls, scraping_delay, language, max_in_flight,
+                                                        extraction_pool=extraction_pool,
+                                                        translation_stage=translation_stage))
+            elif workers > 1:
+                # Fetching is almost entirely network wait, so a thread pool gives
+                # near-linear speedup. executor.map yields results in input order,
+                # which keeps the CSV identical to the serial path.
+                log(f"Processing with {workers} concurrent workers")
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    results = list(executor.map(
+                        lambda item: scrape_url(item[0], item[1], len(urls), scraping_delay, language,
+                                                extraction_pool, translation_stage),
+                        enumerate(urls)
+                    ))
             else:
-                log("Failed to process product for WooCommerce", "ERROR")
+                results = [scrape_url(i, current_url, len(urls), scraping_delay, language,
+                                      translation_stage=translation_stage)
+                           for i, current_url in enumerate(urls)]
+            # Wait for products still in the translation stage
+            results = [result.result() if isinstance(result, Future) else result for result in results]
+        finally:
+            if extraction_pool is not None:
+                extraction_pool.shutdown()
+            if translation_stage is not None:
+                translation_stage.shutdown()
+                log(translation_stage.progress())
+        
+        all_products = [product for product in results if product]
                 
         # Save raw product data for debugging
         if all_products:
@@ -2260,6 +4549,53 @@ def main(scraping_delay=2, language='en'):
         else:
             log("No products were processed successfully", "WARNING")
         
+        elapsed = time.monotonic() - started
+        log(f"Processed {len(urls)} URLs in {elapsed:.2f}s ({elapsed / len(urls) * 1000:.0f} ms per URL)")
+        if REPLAY_SOURCE is not None:
+            log(f"Replay finished: {REPLAY_SOURCE.misses} requests had no archived page")
+        for group, status in ADAPTIVE_CONCURRENCY.report().items():
+            log(f"Final concurrency limit for {group}: {status['limit']} (recent success rate: {status['success_rate']})")
+        for stage, stage_stats in STAGE_STATS.report().items():
+            extra = ', '.join(f"{value} {name}" for name, value in stage_stats.items()
+                              if name not in ('calls', 'seconds', 'max_seconds'))
+            log(f"Stage '{stage}': {stage_stats['calls']} pages, "
+                f"{stage_stats['seconds'] / stage_stats['calls'] * 1000:.1f} ms avg, "
+                f"{stage_stats['max_seconds'] * 1000:.1f} ms max{', ' + extra if extra else ''}")
+        for field, chain in EXTRACTOR_CHAINS.items():
+            log(f"Extractor chain '{field}': " + ', '.join(
+                f"{entry['strategy']} {entry['successes']}/{entry['calls']}"
+                f" {entry['seconds'] / max(entry['calls'], 1) * 1000:.1f} ms"
+                f"{' (demoted)' if entry['demoted'] else ''}"
+                for entry in chain.report()))
+        regex_stats = REGEXES.report()
+        for name, pattern_stats in list(regex_stats.items())[:10]:
+            if pattern_stats['calls']:
+                log(f"Regex {name}: {pattern_stats['calls']} calls, {pattern_stats['matches']} matches, "
+                    f"{pattern_stats['seconds'] * 1000:.1f} ms")
+        unmatched = [name for name, pattern_stats in regex_stats.items() if pattern_stats['calls'] and not pattern_stats['matches']]
+        if unmatched:
+            log(f"Regexes that never matched this run: {', '.join(sorted(unmatched))}")
+        if RESPONSE_CACHE.enabled and REPLAY_SOURCE is None:
+            cache_stats = RESPONSE_CACHE.stats
+            log(f"Response cache: {cache_stats['hits']} fresh hits, {cache_stats['revalidated']} revalidated (304), "
+                f"{cache_stats['misses']} downloaded, {cache_stats['stored']} stored")
+        if TRANSLATION_CACHE.enabled:
+            translation_stats = TRANSLATION_CACHE.stats
+            lookups = translation_stats['hits'] + translation_stats['misses']
+            log(f"Translation cache: {translation_stats['hits']}/{lookups} hits, "
+                f"{translation_stats['stored']} stored, {translation_stats['evicted']} evicted")
+        for name, provider_stats in TRANSLATION_ROUTER.report().items():
+            if provider_stats['calls']:
+                latency = provider_stats['latency']
+                log(f"Translation provider {name}: {provider_stats['calls']} calls, "
+                    f"{provider_stats['failures']} failed, "
+                    f"{'no successful calls' if latency is None else f'{latency * 1000:.0f} ms rolling latency'}, "
+                    f"circuit opened {provider_stats['opened']} times")
+        if TRANSLATION_BATCHER.enabled and REPLAY_SOURCE is None:
+            batch_stats = TRANSLATION_BATCHER.stats
+            log(f"Translation batching: {batch_stats['segments']} segments in {batch_stats['requests']} requests "
+                f"({batch_stats['mismatched']} batches did not split cleanly)")
+        
         # Clean up temporary files
         clean_up_temp_files()
         
@@ -2267,24 +4603,36 @@ def main(scraping_delay=2, language='en'):
         
     except Exception as e:
         log(f"Error in main: {str(e)}", "ERROR")
+    finally:
+        # Also on errors and early returns: flush the archive writer's queued
+        # pages and commit the translation memory
+        SESSION_POOL.close()
+        HTML_ARCHIVE.close()
+        TRANSLATION_CACHE.close()
+        REPLAY_SOURCE = None
 
-def run(scraping_delay=2):
+def run(scraping_delay=2, workers=1, fetch_mode=None, replay_dir=None):
     """Entry point for the script"""
     print("\n=== Starting script execution ===")
     print(f"Python version: {sys.version}")
     print(f"Current directory: {os.getcwd()}")
     print("\nChecking for required files...")
     
+    if replay_dir:
+        if not os.path.isdir(replay_dir):
+            print(f"Error: replay directory {replay_dir} not found")
+            return 1
+        print(f"[OK] Replaying archived pages from {replay_dir}")
     # Check if urls.txt exists
-    if not os.path.exists('urls.txt'):
+    elif not os.path.exists('urls.txt'):
         print("Error: urls.txt not found in the current directory")
         return 1
-    
-    print("[OK] urls.txt found")
+    else:
+        print("[OK] urls.txt found")
     
     try:
         print("\n=== Starting main function ===")
-        main(scraping_delay=scraping_delay)
+        main(scraping_delay=scraping_delay, workers=workers, fetch_mode=fetch_mode, replay_dir=replay_dir)
         print("\n=== Main function completed successfully ===")
         return 0
     except Exception as e:
@@ -2298,6 +4646,10 @@ if __name__ == "__main__":
     import argparse
     parser = argparse.ArgumentParser()
     parser.add_argument('--scraping_delay', type=int, default=2, help='Delay between requests in seconds')
+    parser.add_argument('--workers', type=int, default=1, help='Number of URLs to process concurrently (1 = serial)')
+    parser.add_argument('--async', dest='use_async', action='store_true', help='Use the asyncio fetch pipeline')
+    parser.add_argument('--replay', metavar='DIR', help='Re-process archived HTML from DIR without any network access')
     args = parser.parse_args()
     print("Script started...")
-    sys.exit(run(scraping_delay=args.scraping_delay))
\ No newline at end of file
+    sys.exit(run(scraping_delay=args.scraping_delay, workers=max(1, args.workers),
+                 fetch_mode='async' if args.use_async else None, replay_dir=args.replay))